@@ -9,6 +9,8 @@ class Settings(BaseSettings):
     APP_TIMEZONE: str = "Asia/Kolkata"  # Default to IST
     
     DATABASE_URL: str = ""
+    AUTO_CREATE_TABLES: bool = True  # create_all on startup; set False once the schema exists to skip catalog checks on cold boot
+    DB_STATEMENT_CACHE_SIZE: int = 0  # asyncpg prepared-statement cache; must stay 0 behind the Supabase/pgbouncer transaction pooler
     
     SECRET_KEY: str = "SECRET_KEY"
     ALGORITHM: str = "HS256"
@@ -34,6 +36,10 @@ class Settings(BaseSettings):
     
     USE_AI_FORECASTING: bool = True
     ENABLE_SCHEDULER: bool = True  # Set to False when using external cron (e.g., GitHub Actions)
+    NOTIFICATION_LLM_BUDGET_SECONDS: int = 600  # Total LLM wait allowed per scheduled notification batch
+    NOTIFICATION_CONCURRENCY: int = 10  # Parallel notification sends; keep <= database pool_size
+    SYNC_EXTRACTION_CONCURRENCY: int = 4  # Emails extracted in parallel per sync (local inference itself is serialized)
+    SYNC_USER_CONCURRENCY: int = 4  # Users synced in parallel by the scheduled Gmail job; keep <= database pool_size
     
     GROQ_API_KEY: str = ""
     GROQ_MODEL: str = "llama-3.1-8b-instant"
@@ -43,6 +49,9 @@ class Settings(BaseSettings):
     LOCAL_MODEL_REPO: str = "bartowski/google_gemma-4-E4B-it-GGUF"
     LOCAL_MODEL_FILE: str = "google_gemma-4-E4B-it-Q4_K_M.gguf"
     LOCAL_MODEL_DIR: str = "models"
+    LLM_CACHE_ENABLED: bool = True  # Reuse responses for identical low-temperature prompts
+    LLM_CACHE_TTL_SECONDS: int = 604800  # 7 days
+    LLM_CACHE_MAX_SIZE: int = 1024
     
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
@@ -24,7 +24,9 @@ try:
     else:
         # PostgreSQL configuration
         connect_args = {
-            "statement_cache_size": 0,  # Required for Supabase pooler
+            # 0 is required for the Supabase pooler; direct/session connections can raise it so
+            # repeated dashboard queries reuse their prepared statements instead of re-parsing
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
             "server_settings": {
                 "application_name": "grip_backend",
                 "search_path": "public"
@@ -1,7 +1,9 @@
 import smtplib
+import asyncio
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
+from typing import Optional
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -9,6 +11,39 @@ logger = logging.getLogger(__name__)
 
 import httpx
 
+# Shared async client for the relay so batched notification sends reuse one
+# keep-alive connection (single TLS handshake) instead of reconnecting per email.
+# The client's connections belong to the loop that opened them, so it is
+# recreated when a different loop (e.g. a job's own asyncio.run) asks for it.
+_relay_client: Optional[httpx.AsyncClient] = None
+_relay_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_relay_client() -> httpx.AsyncClient:
+    global _relay_client, _relay_client_loop
+    loop = asyncio.get_running_loop()
+    if _relay_client is None or _relay_client.is_closed or _relay_client_loop is not loop:
+        _relay_client = httpx.AsyncClient(timeout=15.0)
+        _relay_client_loop = loop
+    return _relay_client
+
+async def close_relay_client():
+    """Close the shared relay client if it was opened on the current loop (called on app shutdown)."""
+    global _relay_client, _relay_client_loop
+    if _relay_client is not None and _relay_client_loop is asyncio.get_running_loop():
+        await _relay_client.aclose()
+    _relay_client = None
+    _relay_client_loop = None
+
+def _relay_request(to_email: str, subject: str, html_content: str):
+    payload = {
+        "to_email": to_email,
+        "subject": subject,
+        "html_content": html_content,
+        "from_name": settings.FROM_NAME
+    }
+    headers = {"X-Grip-Secret": settings.EMAIL_RELAY_SECRET}
+    return payload, headers
+
 def send_email(to_email: str, subject: str, html_content: str):
     """
     Sends an email using either a Vercel Microservice relay (Approach C)
@@ -17,13 +52,7 @@ def send_email(to_email: str, subject: str, html_content: str):
     # External Relay (Recommended for cloud hosting like HF Spaces as required ports are blocked)
     if settings.EMAIL_RELAY_URL and settings.EMAIL_RELAY_SECRET:
         try:
-            payload = {
-                "to_email": to_email,
-                "subject": subject,
-                "html_content": html_content,
-                "from_name": settings.FROM_NAME
-            }
-            headers = {"X-Grip-Secret": settings.EMAIL_RELAY_SECRET}
+            payload, headers = _relay_request(to_email, subject, html_content)
             
             # Using synchronous request for simplicity in background tasks, 
             # though async is generally better.
@@ -38,6 +67,9 @@ def send_email(to_email: str, subject: str, html_content: str):
             logger.error(f"Relay connection error: {e}")
             return False
 
+    return _send_via_smtp(to_email, subject, html_content)
+
+def _send_via_smtp(to_email: str, subject: str, html_content: str):
     # --- LEGACY DIRECT SMTP (Approach A/B) ---
     # NOTE: DO NOT REMOVE THIS BLOCK. 
     # Standard SMTP (Port 587/465) is frequently blocked on cloud providers like HF Spaces.
@@ -74,6 +106,25 @@ def send_email(to_email: str, subject: str, html_content: str):
     logger.warning("No email relay or SMTP configured accurately.")
     return False
 
+async def send_email_async(to_email: str, subject: str, html_content: str):
+    """
+    Non-blocking variant of send_email for the async notification pipeline.
+    Reuses a pooled relay connection; legacy SMTP runs in a worker thread.
+    """
+    if settings.EMAIL_RELAY_URL and settings.EMAIL_RELAY_SECRET:
+        try:
+            payload, headers = _relay_request(to_email, subject, html_content)
+            resp = await _get_relay_client().post(settings.EMAIL_RELAY_URL, json=payload, headers=headers)
+            if resp.status_code == 200:
+                return True
+            logger.error(f"Relay failed ({resp.status_code}): {resp.text}")
+            return False
+        except Exception as e:
+            logger.error(f"Relay connection error: {e}")
+            return False
+
+    return await asyncio.to_thread(_send_via_smtp, to_email, subject, html_content)
+
 def send_otp_email(to_email: str, otp: str):
     subject = f"Your {settings.APP_NAME} Verification Code: {otp}"
     html_content = f"""
@@ -1,11 +1,15 @@
 import logging
 import re
+import time
+import hashlib
 import httpx
 import json
+import orjson
 import asyncio
 import os
 import threading
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Type, TypeVar
+from pydantic import BaseModel, ValidationError
 from app.core.config import get_settings
 
 print(">>> LLM MODULE IMPORTED", flush=True)
@@ -24,12 +28,22 @@ except Exception as e:
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Output/cleanup patterns compiled once rather than per call
+_THOUGHT_BLOCK_RE = re.compile(r'<\|channel>thought.*?<channel\|>', re.DOTALL)
+_GREETING_RE = re.compile(r'(?i)(Dear|Hello|Hi)\s+[A-Za-z\s]+,')
+_JSON_OBJECT_RE = re.compile(r'(\{.*\})', re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r',\s*([\]\}])')
+
 class LocalLLMEngine:
     """Handles local execution of GGUF models using llama-cpp-python."""
     
     def __init__(self):
         self._model = None
         self._lock = threading.Lock()
+        # A Llama instance is not thread-safe; callers may run generate() from several executor threads
+        self._infer_lock = threading.Lock()
         self.repo_id = settings.LOCAL_MODEL_REPO
         self.filename = settings.LOCAL_MODEL_FILE
         self.models_dir = settings.LOCAL_MODEL_DIR
@@ -98,11 +112,11 @@ class LocalLLMEngine:
         if not text:
             return text
         # Gemma 4 thought pattern: <|channel>thought ... <channel|>
-        text = re.sub(r'<\|channel>thought.*?<channel\|>', '', text, flags=re.DOTALL)
+        text = _THOUGHT_BLOCK_RE.sub('', text)
         return text.strip()
 
-    def generate(self, prompt: str, system_prompt: str, temperature: float) -> Optional[str]:
-        """Generate response using the local model."""
+    def generate(self, prompt: str, system_prompt: str, temperature: float, json_schema: Optional[dict] = None) -> Optional[str]:
+        """Generate response using the local model. A json_schema constrains decoding to matching JSON."""
         model = self._ensure_model()
         if not model:
             return None
@@ -113,28 +127,38 @@ class LocalLLMEngine:
             start_t = time.perf_counter()
             
             # Use native chat completion API to handle GGUF chat template safely
-            try:
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
-
-                output = model.create_chat_completion(
-                    messages=messages,
-                    max_tokens=512,
-                    temperature=temperature
-                )
-                raw_text = output['choices'][0]['message']['content'].strip()
-            except Exception as chat_err:
-                logger.warning(f"LocalLLMEngine: create_chat_completion failed ({chat_err}), falling back to direct prompt execution.")
-                formatted_prompt = f"System: {system_prompt}\nUser: {prompt}\nAssistant:"
-                output = model(
-                    formatted_prompt,
-                    max_tokens=512,
-                    temperature=temperature,
-                    echo=False
-                )
-                raw_text = output['choices'][0]['text'].strip()
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+            chat_kwargs = {}
+            prompt_kwargs = {}
+            if json_schema:
+                from llama_cpp import LlamaGrammar
+                chat_kwargs["response_format"] = {"type": "json_object", "schema": json_schema}
+                prompt_kwargs["grammar"] = LlamaGrammar.from_json_schema(json.dumps(json_schema), verbose=False)
+
+            with self._infer_lock:
+                try:
+                    output = model.create_chat_completion(
+                        messages=messages,
+                        max_tokens=512,
+                        temperature=temperature,
+                        **chat_kwargs
+                    )
+                    raw_text = output['choices'][0]['message']['content'].strip()
+                except Exception as chat_err:
+                    logger.warning(f"LocalLLMEngine: create_chat_completion failed ({chat_err}), falling back to direct prompt execution.")
+                    formatted_prompt = f"System: {system_prompt}\nUser: {prompt}\nAssistant:"
+                    output = model(
+                        formatted_prompt,
+                        max_tokens=512,
+                        temperature=temperature,
+                        echo=False,
+                        **prompt_kwargs
+                    )
+                    raw_text = output['choices'][0]['text'].strip()
 
             inf_time = (time.perf_counter() - start_t) * 1000
             text = self._strip_thoughts(raw_text)
@@ -146,6 +170,10 @@ class LocalLLMEngine:
 
 class LLMService:
     """Centralized service for Large Language Model interactions."""
+
+    # Response cache: {sha256_key: (timestamp, content)}. Only deterministic (low-temperature) calls are cached.
+    _response_cache: Dict[str, tuple] = {}
+    CACHE_MAX_TEMPERATURE = 0.1
     
     def __init__(self):
         self.groq_api_key = settings.GROQ_API_KEY
@@ -173,21 +201,50 @@ class LLMService:
         """Extra PII scrub before sending to any external/third-party LLM API."""
         if not text:
             return text
-        text = re.sub(r'(?i)(Dear|Hello|Hi)\s+[A-Za-z\s]+,', r'\1 Customer,', text)
+        text = _GREETING_RE.sub(r'\1 Customer,', text)
         for pattern, label in self._pii_patterns:
             text = pattern.sub(label, text)
         return text
 
+    def _response_cache_key(self, prompt: str, system_prompt: Optional[str], json_schema: Optional[dict]) -> str:
+        schema_str = orjson.dumps(json_schema, option=orjson.OPT_SORT_KEYS).decode() if json_schema else ""
+        raw = f"{settings.LOCAL_MODEL_FILE}|{system_prompt or ''}|{schema_str}|{prompt}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _get_cached_response(self, key: str) -> Optional[str]:
+        entry = LLMService._response_cache.get(key)
+        if not entry:
+            return None
+        ts, content = entry
+        if (time.time() - ts) >= settings.LLM_CACHE_TTL_SECONDS:
+            LLMService._response_cache.pop(key, None)
+            return None
+        return content
+
+    def _set_cached_response(self, key: str, content: str):
+        if len(LLMService._response_cache) >= settings.LLM_CACHE_MAX_SIZE:
+            LLMService._response_cache.pop(next(iter(LLMService._response_cache)))
+        LLMService._response_cache[key] = (time.time(), content)
+
     async def generate_response(
         self, 
         prompt: str, 
         system_prompt: Optional[str] = "You are a helpful financial assistant.",
         temperature: float = 0.5,
         response_format: Optional[str] = None,
-        timeout: float = 120.0 # Increased timeout for local inference
+        timeout: float = 120.0, # Increased timeout for local inference
+        json_schema: Optional[dict] = None
     ) -> Optional[str]:
         """Generic method to generate a response, prioritizing local execution."""
         global HAS_LLAMA_CPP
+
+        cache_key = None
+        if settings.LLM_CACHE_ENABLED and temperature <= self.CACHE_MAX_TEMPERATURE:
+            cache_key = self._response_cache_key(prompt, system_prompt, json_schema)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                logger.info(">>> LLM_ENGINE: Response cache hit.")
+                return cached
         
         # 1. Try Local Engine (Primary — high privacy, no costs)
         if HAS_LLAMA_CPP:
@@ -199,10 +256,13 @@ class LLMService:
                     self.local_engine.generate, 
                     prompt, 
                     system_prompt, 
-                    temperature
+                    temperature,
+                    json_schema
                 )
                 if res:
                     logger.info(">>> LLM_ENGINE: Local (Gemma 4) success.")
+                    if cache_key:
+                        self._set_cached_response(cache_key, res)
                     return res
                 # If we get here it means inference failed or engine is broken
             except Exception as e:
@@ -284,26 +344,79 @@ class LLMService:
             response_format="json_object",
             timeout=timeout
         )
-        
+        return self._parse_json(content)
+
+    async def generate_structured(
+        self,
+        schema: Type[ModelT],
+        prompt: str,
+        system_prompt: Optional[str] = "You are a financial intelligence engine. Always output valid JSON objects.",
+        temperature: float = 0.2,
+        timeout: float = 60.0
+    ) -> Optional[ModelT]:
+        """JSON response validated into `schema`; the local engine decodes against its JSON schema."""
+        content = await self.generate_response(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            response_format="json_object",
+            timeout=timeout,
+            json_schema=schema.model_json_schema()
+        )
+        data = self._parse_json(content)
+        if not isinstance(data, dict):
+            return None
+        try:
+            return schema.model_validate(data)
+        except ValidationError as e:
+            logger.error(f"LLM structured output failed validation: {e.error_count()} error(s).")
+            return None
+
+    def _parse_json(self, content: Optional[str]) -> Optional[Dict[str, Any]]:
         if not content:
             return None
             
         try:
-            json_match = re.search(r'(\{.*\})', content, re.DOTALL)
+            json_match = _JSON_OBJECT_RE.search(content)
             if json_match:
                 content = json_match.group(1)
             
             content = content.strip().replace('```json', '').replace('```', '').strip()
-            return json.loads(content)
+            return orjson.loads(content)
         except (json.JSONDecodeError, IndexError) as e:
             logger.error(f"LLM JSON Decode Error: {e}. Content: {content[:200]}...")
             try:
                 # Last resort cleanup
-                cleaned = re.sub(r',\s*([\]\}])', r'\1', content)
-                return json.loads(cleaned)
+                cleaned = _TRAILING_COMMA_RE.sub(r'\1', content)
+                return orjson.loads(cleaned)
             except Exception:
                 return None
 
+    async def generate_json_multi(
+        self,
+        prompts: Dict[str, str],
+        temperature: float = 0.7,
+        timeout: float = 60.0
+    ) -> Dict[str, Any]:
+        """
+        Answer several independent prompts in a single round-trip.
+        Returns a dict keyed like `prompts`; keys the model missed are omitted.
+        """
+        sections = "\n\n".join(f"### {key}\n{prompt.strip()}" for key, prompt in prompts.items())
+        keys = ", ".join(f'"{key}"' for key in prompts)
+        combined_prompt = f"""
+        Complete each task below independently. Each task is labelled with its key.
+
+        {sections}
+
+        Return ONE JSON object only, NO markdown, with exactly these keys: {keys}.
+        Each value is that task's answer (plain text, or the JSON object the task asks for).
+        """
+        data = await self.generate_json(combined_prompt, temperature=temperature, timeout=timeout)
+        if not isinstance(data, dict):
+            return {}
+        return {key: value for key, value in data.items() if key in prompts}
+
 # Singleton-like instance
 _llm_service = None
 
@@ -16,6 +16,7 @@ PII_PATTERNS = {
     'PAN': re.compile(r'[A-Z]{5}[0-9]{4}[A-Z]{1}'),
     'AADHAAR': re.compile(r'\d{4}\s\d{4}\s\d{4}'),
 }
+GREETING_PATTERN = re.compile(r'(?i)(Dear|Hello|Hi)\s+[A-Za-z\s]+,')
 
 class PIISanitizingFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
@@ -23,7 +24,7 @@ class PIISanitizingFormatter(logging.Formatter):
         message = super().format(record)
         
         # Sanitize greetings
-        message = re.sub(r'(?i)(Dear|Hello|Hi)\s+[A-Za-z\s]+,', r'\1 Customer,', message)
+        message = GREETING_PATTERN.sub(r'\1 Customer,', message)
         
         # Sanitize patterns
         for label, pattern in PII_PATTERNS.items():
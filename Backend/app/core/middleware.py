@@ -1,6 +1,7 @@
-from fastapi import Request, Response, status
-from starlette.middleware.base import BaseHTTPMiddleware
+import time
+from fastapi import status
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from jose import jwt, JWTError
 from app.core.config import get_settings
 
@@ -8,36 +9,55 @@ settings = get_settings()
 import logging
 logger = logging.getLogger(__name__)
 
-class AuthenticationMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # 1. Check for Bypass/Exception Routes
-        path = request.url.path
-        
-        is_exception = False
+class AuthenticationMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware): requests pass straight through to the app
+    without an extra task or Request/Response wrapping; only the response status is observed.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _is_exception_route(self, path: str) -> bool:
         for route in settings.EXCEPTION_ROUTES:
             if route == "/":
                 if path == "/":
-                    is_exception = True
-                    break
+                    return True
             elif path.startswith(route):
-                is_exception = True
-                break
-        
-        if is_exception:
+                return True
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 1. Check for Bypass/Exception Routes. OPTIONS never carries credentials; real CORS
+        # preflights are already answered by CORSMiddleware before reaching this layer
+        path = scope["path"]
+        if scope["method"] == "OPTIONS" or self._is_exception_route(path):
             logger.debug(f"Bypassing authentication for path: {path}")
-            return await call_next(request)
-        
-        # 2. Extract Token
-        auth_header = request.headers.get("Authorization")
+            await self.app(scope, receive, send)
+            return
+
+        # 2. Extract Token (ASGI header names are lower-cased bytes)
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
+
         if not auth_header or not auth_header.startswith("Bearer "):
             logger.warning(f"Authentication failed: Missing or invalid token for path {path}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Not authenticated"}
             )
-        
+            await response(scope, receive, send)
+            return
+
         token = auth_header.split(" ")[1]
-        
+
         # 3. Validate Token
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -46,29 +66,40 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
                 raise JWTError
         except JWTError:
             logger.warning(f"Authentication failed: Invalid token for path {path}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "Could not validate credentials"}
             )
-            
+            await response(scope, receive, send)
+            return
+
         # 4. Stateless Authentication
         # We trust the token signature. We do NOT hit the DB here.
         # Downstream dependencies (get_current_user) will fetch the full user object if needed.
-        request.state.user_email = email
-        # logger.debug(f"Token valid for {email}, proceeding statelessly for {path}")
-        
+        # scope["state"] backs request.state, so this is read as request.state.user_email
+        scope.setdefault("state", {})["user_email"] = email
+
         # 5. Process request
-        import time
         start_time = time.perf_counter()
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                process_time = (time.perf_counter() - start_time) * 1000
+                logger.info(f"PERF: {message['status']} for {path} | Total: {process_time:.2f}ms")
+            await send(message)
+
         try:
-            response = await call_next(request)
-            process_time = (time.perf_counter() - start_time) * 1000
-            logger.info(f"PERF: {response.status_code} for {path} | Total: {process_time:.2f}ms")
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             logger.error(f"Error in middleware processing {path}: {e}", exc_info=True)
-            return JSONResponse(
+            if response_started:
+                # Headers already went out; nothing valid can be sent in their place
+                raise
+            response = JSONResponse(
                 status_code=500,
                 content={"detail": "Internal Server Error in Middleware", "msg": str(e)}
             )
-
+            await response(scope, receive, send)
@@ -1,5 +1,7 @@
 
+import asyncio
 import logging
+import time
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -20,6 +22,12 @@ settings = get_settings()
 
 scheduler = AsyncIOScheduler()
 
+# Ledger items that get surety reminders
+REMINDER_ITEM_TYPES = frozenset({"BILL", "SURETY_TXN"})
+REMINDER_ITEM_STATUSES = frozenset({"PROJECTED", "PENDING", "OVERDUE"})
+# Inactivity (in days) that triggers a nudge
+INACTIVITY_NUDGE_DAYS = frozenset({7, 14})
+
 async def run_daily_price_sync():
     """
     Task to sync prices for all investment holdings.
@@ -59,6 +67,7 @@ async def run_surety_reminders():
     async with AsyncSessionLocal() as db:
         llm_service = get_llm_service()
         notification_service = NotificationService(db, llm_service)
+        notification_service.start_llm_budget(settings.NOTIFICATION_LLM_BUDGET_SECONDS)
         bill_service = BillService()
         cc_service = CreditCardService()
         
@@ -68,7 +77,7 @@ async def run_surety_reminders():
         users = res_users.scalars().all()
         
         for user in users:
-            full_name = user.full_name or user.email.split('@')[0]
+            full_name = user.full_name or user.email.partition('@')[0]
             
             # --- PART A: Credit Cards ---
             try:
@@ -122,8 +131,8 @@ async def run_surety_reminders():
             try:
                 ledger = await bill_service.get_obligations_ledger(db, user.id, days_ahead=60, include_hidden=False)
                 for item in ledger["items"]:
-                    if item.type in ["BILL", "SURETY_TXN"]:
-                        if item.status in ["PROJECTED", "PENDING", "OVERDUE"]:
+                    if item.type in REMINDER_ITEM_TYPES:
+                        if item.status in REMINDER_ITEM_STATUSES:
                             # We check if due date matches one of our target dates
                             if item.due_date in target_dates:
                                 await notification_service.send_surety_reminder(
@@ -152,9 +161,6 @@ async def run_weekly_insights():
     from app.features.notifications.service import NotificationService
     
     async with AsyncSessionLocal() as db:
-        llm_service = get_llm_service()
-        notification_service = NotificationService(db, llm_service)
-        
         # 1. Find categories where spend > 1000 in last 7 days
         # Exclude 'Investment'
         seven_days_ago = datetime.now() - timedelta(days=7)
@@ -172,30 +178,41 @@ async def run_weekly_insights():
         data = result.all()
         logger.info(f"Weekly Insights: Found {len(data)} user/category pairs over ₹1,000 threshold.")
         
-        # 2. Group by user for consolidated emails
-        user_insights = {}
-        for user_id, full_name, category, total in data:
-            if user_id not in user_insights:
-                user_insights[user_id] = {
-                    "full_name": full_name,
-                    "items": []
-                }
-            user_insights[user_id]["items"].append({
-                "category": category,
-                "amount": float(total)
-            })
-            
-        # 3. Send consolidated emails
-        for user_id, info in user_insights.items():
-            try:
-                await notification_service.send_weekly_summary(
-                    user_id, 
-                    info["full_name"], 
-                    info["items"]
-                )
-                logger.info(f"Sent consolidated weekly recap to user {user_id} ({len(info['items'])} categories)")
-            except Exception as e:
-                logger.error(f"Failed to send weekly recap for user {user_id}: {e}")
+    # 2. Group by user for consolidated emails
+    user_insights = {}
+    for user_id, full_name, category, total in data:
+        if user_id not in user_insights:
+            user_insights[user_id] = {
+                "full_name": full_name,
+                "items": []
+            }
+        user_insights[user_id]["items"].append({
+            "category": category,
+            "amount": float(total)
+        })
+        
+    # 3. Send consolidated emails concurrently, capped to the DB pool size
+    llm_service = get_llm_service()
+    llm_deadline = time.monotonic() + settings.NOTIFICATION_LLM_BUDGET_SECONDS
+    semaphore = asyncio.Semaphore(settings.NOTIFICATION_CONCURRENCY)
+
+    async def _send_recap(user_id, info):
+        async with semaphore:
+            # AsyncSession is not safe for concurrent use, so each send gets its own
+            async with AsyncSessionLocal() as user_db:
+                notification_service = NotificationService(user_db, llm_service)
+                notification_service.llm_deadline = llm_deadline
+                try:
+                    await notification_service.send_weekly_summary(
+                        user_id, 
+                        info["full_name"], 
+                        info["items"]
+                    )
+                    logger.info(f"Sent consolidated weekly recap to user {user_id} ({len(info['items'])} categories)")
+                except Exception as e:
+                    logger.error(f"Failed to send weekly recap for user {user_id}: {e}")
+
+    await asyncio.gather(*[_send_recap(user_id, info) for user_id, info in user_insights.items()])
 
     logger.info("Weekly Insights Completed.")
 
@@ -221,29 +238,39 @@ async def run_monthly_report(target_date: Optional[date] = None):
         month_idx = ref_date.month
         year_idx = ref_date.year
 
+    from app.features.notifications.service import NotificationService
+    analytics_service = AnalyticsService()
+
     async with AsyncSessionLocal() as db:
-        from app.features.notifications.service import NotificationService
-        notification_service = NotificationService(db)
-        analytics_service = AnalyticsService()
-        
         result = await db.execute(select(User))
         users = result.scalars().all()
-        
-        for user in users:
-            try:
-                # Get full monthly summary & variance
-                summary = await analytics_service.get_monthly_summary(db, user.id, month=month_idx, year=year_idx)
-                variance = await analytics_service.get_variance_analysis(db, user.id, month=month_idx, year=year_idx)
-                
-                await notification_service.send_monthly_report(
-                    user_id=user.id,
-                    full_name=user.full_name,
-                    summary=summary,
-                    variance=variance
-                )
-                logger.info(f"Sent monthly report to {user.id} for {month_idx}/{year_idx}")
-            except Exception as e:
-                logger.error(f"Failed monthly report for {user.id}: {e}")
+
+    # Reports are independent per user: fan out under a cap matched to the DB pool size
+    llm_deadline = time.monotonic() + settings.NOTIFICATION_LLM_BUDGET_SECONDS
+    semaphore = asyncio.Semaphore(settings.NOTIFICATION_CONCURRENCY)
+
+    async def _send_report(user):
+        async with semaphore:
+            # AsyncSession is not safe for concurrent use, so each report gets its own
+            async with AsyncSessionLocal() as user_db:
+                notification_service = NotificationService(user_db)
+                notification_service.llm_deadline = llm_deadline
+                try:
+                    # Get full monthly summary & variance
+                    summary = await analytics_service.get_monthly_summary(user_db, user.id, month=month_idx, year=year_idx)
+                    variance = await analytics_service.get_variance_analysis(user_db, user.id, month=month_idx, year=year_idx)
+                    
+                    await notification_service.send_monthly_report(
+                        user_id=user.id,
+                        full_name=user.full_name,
+                        summary=summary,
+                        variance=variance
+                    )
+                    logger.info(f"Sent monthly report to {user.id} for {month_idx}/{year_idx}")
+                except Exception as e:
+                    logger.error(f"Failed monthly report for {user.id}: {e}")
+
+    await asyncio.gather(*[_send_report(user) for user in users])
 
     logger.info("Monthly Report Job Completed.")
     
@@ -264,6 +291,7 @@ async def run_lifestyle_insights(override_date: Optional[date] = None):
     async with AsyncSessionLocal() as db:
         from app.features.notifications.service import NotificationService
         notification_service = NotificationService(db)
+        notification_service.start_llm_budget(settings.NOTIFICATION_LLM_BUDGET_SECONDS)
         analytics_service = AnalyticsService()
         
         # 1. Fetch all users
@@ -278,26 +306,19 @@ async def run_lifestyle_insights(override_date: Optional[date] = None):
                 res = await db.execute(stmt)
                 last_txn_date = res.scalar()
                 
+                nudge_days = None
                 if last_txn_date:
                     days_diff = (today - last_txn_date).days
                     # If inactive for exactly 7 or 14 days, send a nudge
-                    if days_diff in [7, 14]:
-                        await notification_service.send_inactivity_nudge(user.id, user.full_name, days_diff)
-                        logger.info(f"Sent inactivity nudge to {user.id} ({days_diff} days)")
+                    if days_diff in INACTIVITY_NUDGE_DAYS:
+                        nudge_days = days_diff
 
-                # --- CHECK 2: BUFFER EMERGENCY BRAKE ---
-                # Check if safe-to-spend is below the required buffer
+                # Safe-to-spend feeds both the buffer brake and the weekend insight
                 sts_data = await analytics_service.calculate_safe_to_spend_amount(db, user.id)
-                # If safe-to-spend is zero or negative, it means the buffer is exhausted
-                if sts_data.safe_to_spend <= 0:
-                    await notification_service.send_buffer_alert(user.id, user.full_name, float(sts_data.safe_to_spend))
-                    logger.info(f"Sent buffer emergency brake to {user.id}")
 
-                # --- CHECK 3: WEEKEND (FRIDAY) ---
-                if today.weekday() == 4: # 4 is Friday
-                    # Calculate safe-to-spend for this user
-                    sts_data = await analytics_service.calculate_safe_to_spend_amount(db, user.id)
-                    
+                top_category = None
+                is_friday = today.weekday() == 4 # 4 is Friday
+                if is_friday:
                     # Fetch top category for the last 7 days for more insight
                     seven_days_ago = today - timedelta(days=7)
                     cat_stmt = (
@@ -312,14 +333,38 @@ async def run_lifestyle_insights(override_date: Optional[date] = None):
                     cat_res = await db.execute(cat_stmt)
                     top_cat_row = cat_res.first()
                     top_category = top_cat_row.category if top_cat_row else None
-                    
+
+                # Users due both a nudge and a weekend insight get both blurbs from one LLM call
+                ai_copy = {}
+                if nudge_days and is_friday:
+                    ai_copy = await notification_service.prepare_lifestyle_copy(
+                        user.id,
+                        user.full_name,
+                        days_inactive=nudge_days,
+                        safe_to_spend=float(sts_data.safe_to_spend),
+                        top_category=top_category
+                    )
+
+                if nudge_days:
+                    await notification_service.send_inactivity_nudge(user.id, user.full_name, nudge_days, ai_message=ai_copy.get("nudge"))
+                    logger.info(f"Sent inactivity nudge to {user.id} ({nudge_days} days)")
+
+                # --- CHECK 2: BUFFER EMERGENCY BRAKE ---
+                # If safe-to-spend is zero or negative, it means the buffer is exhausted
+                if sts_data.safe_to_spend <= 0:
+                    await notification_service.send_buffer_alert(user.id, user.full_name, float(sts_data.safe_to_spend))
+                    logger.info(f"Sent buffer emergency brake to {user.id}")
+
+                # --- CHECK 3: WEEKEND (FRIDAY) ---
+                if is_friday:
                     # Trigger the AI-driven weekend insight with more context
                     await notification_service.send_weekend_insight(
                         user_id=user.id, 
                         full_name=user.full_name, 
                         safe_to_spend=float(sts_data.safe_to_spend),
                         current_balance=float(sts_data.current_balance),
-                        top_category=top_category
+                        top_category=top_category,
+                        ai_data=ai_copy.get("weekend")
                     )
                     logger.info(f"Sent weekend insight to {user.id}")
                     
@@ -333,35 +378,42 @@ async def run_gmail_sync():
     Task to sync Gmail transactions for all users.
     """
     logger.info("Starting Gmail Sync...")
+    # Import models inside function to avoid circular imports and ensure registry is ready
+    from app.features.auth.models import User
+    # Ensure relationships are loaded
+    from app.features.credit_cards.models import CreditCard
+    from app.features.bills.models import Bill
+    from app.features.notifications.service import NotificationService
+
+    llm_service = get_llm_service()
+
+    # Fetch users with gmail credentials
     async with AsyncSessionLocal() as db:
-        # Import models inside function to avoid circular imports and ensure registry is ready
-        from app.features.auth.models import User
-        # Ensure relationships are loaded
-        from app.features.credit_cards.models import CreditCard
-        from app.features.bills.models import Bill
-        from app.features.notifications.service import NotificationService
-        
-        # Instantiate services
-        llm_service = get_llm_service()
-        cat_service = CategoryService(db)
-        wealth_service = WealthService(db)
-        txn_service = TransactionService(db)
-        notif_service = NotificationService(db, llm_service)
-        sync_service = SyncService(db, txn_service, cat_service, wealth_service, notif_service, llm_service)
-        
-        # Fetch users with gmail credentials
-        stmt = select(User).where(User.gmail_credentials.isnot(None))
-        result = await db.execute(stmt)
-        users = result.scalars().all()
-        
-        logger.info(f"Found {len(users)} users with Gmail credentials.")
-        
-        for user in users:
-            try:
-                logger.info(f"Syncing Gmail for user {user.id}...")
-                await sync_service.execute_sync(user.id, "SCHEDULED_TASK")
-            except Exception as e:
-                logger.error(f"Gmail sync failed for user {user.id}: {e}")
+        result = await db.execute(select(User.id).where(User.gmail_credentials.isnot(None)))
+        user_ids = result.scalars().all()
+
+    logger.info(f"Found {len(user_ids)} users with Gmail credentials.")
+
+    # Users sync independently (Gmail I/O, DB writes); run a few at a time instead of
+    # strictly one after another. Inference is serialized inside the LLM engine anyway.
+    semaphore = asyncio.Semaphore(settings.SYNC_USER_CONCURRENCY)
+
+    async def _sync_user(user_id):
+        async with semaphore:
+            # AsyncSession is not safe for concurrent use, so each user's sync gets its own
+            async with AsyncSessionLocal() as user_db:
+                cat_service = CategoryService(user_db)
+                wealth_service = WealthService(user_db)
+                txn_service = TransactionService(user_db)
+                notif_service = NotificationService(user_db, llm_service)
+                sync_service = SyncService(user_db, txn_service, cat_service, wealth_service, notif_service, llm_service)
+                try:
+                    logger.info(f"Syncing Gmail for user {user_id}...")
+                    await sync_service.execute_sync(user_id, "SCHEDULED_TASK")
+                except Exception as e:
+                    logger.error(f"Gmail sync failed for user {user_id}: {e}")
+
+    await asyncio.gather(*[_sync_user(user_id) for user_id in user_ids])
                 
     logger.info("Gmail Sync Completed.")
 
@@ -120,15 +120,13 @@ class AnalyticsService:
         
         # Overall variance
         total_variance = current_total - previous_total
-        total_variance_pct = calculate_variance_percentage(
-            Decimal(str(current_total)),
-            Decimal(str(previous_total))
-        )
+        total_variance_pct = calculate_variance_percentage(current_total, previous_total)
         
+        # sum() of Decimals is already a Decimal (or int 0 when empty); no str() round-trip needed
         return VarianceAnalysis(
-            current_month_total=Decimal(str(current_total)),
-            last_month_total=Decimal(str(previous_total)),
-            variance_amount=Decimal(str(total_variance)),
+            current_month_total=Decimal(current_total),
+            last_month_total=Decimal(previous_total),
+            variance_amount=Decimal(total_variance),
             variance_percentage=total_variance_pct,
             category_breakdown=category_breakdown
         )
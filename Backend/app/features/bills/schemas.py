@@ -2,7 +2,7 @@ from typing import Optional
 from uuid import UUID
 from datetime import datetime, date
 from decimal import Decimal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 class BillBase(BaseModel):
     title: str = Field(..., description="Bill title (e.g., 'Rent', 'Electricity')")
@@ -31,8 +31,7 @@ class BillResponse(BillBase):
     is_paid: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class MarkPaidRequest(BaseModel):
     paid: bool = True
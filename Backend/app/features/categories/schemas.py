@@ -1,6 +1,6 @@
 import uuid
 from typing import List, Optional, Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 CategoryType = Literal["EXPENSE", "INCOME", "INVESTMENT"]
 
@@ -27,8 +27,7 @@ class SubCategoryResponse(SubCategoryBase):
     user_id: Optional[uuid.UUID] = None
     is_surety: bool = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class CategoryBase(BaseModel):
     name: str
@@ -50,5 +49,4 @@ class CategoryResponse(CategoryBase):
     user_id: Optional[uuid.UUID] = None
     sub_categories: List[SubCategoryResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
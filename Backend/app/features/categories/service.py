@@ -14,6 +14,9 @@ class CategoryService:
     _cache = None
     _cache_time = 0
     CACHE_TTL = 3600  # 1 hour
+    # Derived from _cache: lower-cased sub-category name -> is_surety
+    _surety_map = None
+    _surety_map_source = None
 
     def __init__(self, db: AsyncSession = Depends(get_db)):
         self.db = db
@@ -28,6 +31,19 @@ class CategoryService:
             CategoryService._cache_time = now
         return CategoryService._cache
 
+    async def get_cached_surety_map(self, user_id: UUID) -> dict:
+        """O(1) is_surety lookup by sub-category name, rebuilt whenever the category cache refreshes."""
+        categories = await self.get_cached_categories(user_id)
+        if CategoryService._surety_map is None or CategoryService._surety_map_source is not categories:
+            surety_map = {}
+            for cat in categories:
+                for sub in cat.sub_categories:
+                    # First occurrence wins, matching the previous linear scan
+                    surety_map.setdefault(sub.name.lower(), sub.is_surety)
+            CategoryService._surety_map = surety_map
+            CategoryService._surety_map_source = categories
+        return CategoryService._surety_map
+
     async def get_categories(self, user_id: UUID) -> List[Category]:
         # Fetch both system categories (user_id=None) and user-specific categories
         # Use contains_eager with explicit join to fetch everything in a SINGLE round-trip
@@ -24,33 +24,29 @@ async def get_liquidity_dashboard(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    balance_stmt = (
-        select(func.sum(Transaction.amount))
-        .where(Transaction.user_id == current_user.id)
-        .where(Transaction.account_type.in_(["CASH", "SAVINGS"]))
-    )
-    
-    cc_stmt = (
-        select(func.sum(Transaction.amount))
-        .where(Transaction.user_id == current_user.id)
-        .where(Transaction.category != "Income")
-        .where(Transaction.account_type == "CREDIT_CARD")
-        .where(Transaction.is_settled == False)
-    )
-    
-    bills_stmt = (
-        select(func.sum(Transaction.amount))
+    # All three sums in one pass over the user's rows (aggregate FILTER clauses)
+    stmt = (
+        select(
+            func.sum(Transaction.amount).filter(
+                Transaction.account_type.in_(["CASH", "SAVINGS"])
+            ).label("balance"),
+            func.sum(Transaction.amount).filter(
+                Transaction.category != "Income",
+                Transaction.account_type == "CREDIT_CARD",
+                Transaction.is_settled == False
+            ).label("unbilled_cc"),
+            func.sum(Transaction.amount).filter(
+                Transaction.sub_category.in_(["Rent", "Maintenance", "Credit Card Payment"])
+            ).label("bills")
+        )
         .where(Transaction.user_id == current_user.id)
-        .where(Transaction.sub_category.in_(["Rent", "Maintenance", "Credit Card Payment"]))
     )
 
-    balance_res = await db.execute(balance_stmt)
-    cc_res = await db.execute(cc_stmt)
-    bills_res = await db.execute(bills_stmt)
+    row = (await db.execute(stmt)).one()
 
-    balance = balance_res.scalar() or 0
-    unbilled_cc = cc_res.scalar() or 0
-    bills = bills_res.scalar() or 0
+    balance = row.balance or 0
+    unbilled_cc = row.unbilled_cc or 0
+    bills = row.bills or 0
     
     # Liquidity is the sum of liquid balance + CC debt (which is negative)
     # If balance is 10,000 and CC debt is -2,000, liquidity is 8,000.
@@ -11,7 +11,7 @@ async def get_daily_expenses(db: AsyncSession, user_id: str, days: int = 90):
     stmt = (
         select(
             Transaction.transaction_date.label("day"),
-            func.sum(Transaction.amount).label("total")
+            func.abs(func.coalesce(func.sum(Transaction.amount), 0)).label("total")
         )
         .where(Transaction.user_id == user_id)
         .where(Transaction.category != "Income")
@@ -27,7 +27,7 @@ async def get_daily_expenses(db: AsyncSession, user_id: str, days: int = 90):
     # Return absolute values because expenses are stored as negative, 
     # but forecasting expects positive magnitude of spend.
     return [
-        {"ds": row.day.isoformat(), "y": abs(float(row.total or 0))}
+        {"ds": row.day.isoformat(), "y": float(row.total)}
         for row in rows
         if row.day is not None # Filter out any missing dates if they exist
     ]
@@ -39,7 +39,7 @@ async def get_category_expenses_history(db: AsyncSession, user_id: str, days: in
     stmt = (
         select(
             Transaction.category,
-            func.sum(Transaction.amount).label("total")
+            func.abs(func.coalesce(func.sum(Transaction.amount), 0)).label("total")
         )
         .where(Transaction.user_id == user_id)
         .where(Transaction.category != "Income")
@@ -52,7 +52,7 @@ async def get_category_expenses_history(db: AsyncSession, user_id: str, days: in
     rows = result.all()
     
     return [
-        {"category": row.category, "total": abs(float(row.total or 0))}
+        {"category": row.category, "total": float(row.total)}
         for row in rows
     ]
 
@@ -64,7 +64,7 @@ async def get_discretionary_daily_expenses(db: AsyncSession, user_id: str, days:
     stmt = (
         select(
             Transaction.transaction_date.label("day"),
-            func.sum(Transaction.amount).label("total")
+            func.abs(func.coalesce(func.sum(Transaction.amount), 0)).label("total")
         )
         .where(Transaction.user_id == user_id)
         .where(Transaction.category.notin_(["Income", "Investment", "Housing", "Bill Payment", "Transfer"]))
@@ -78,7 +78,7 @@ async def get_discretionary_daily_expenses(db: AsyncSession, user_id: str, days:
     rows = result.all()
     
     return [
-        {"ds": row.day.isoformat(), "y": abs(float(row.total or 0))}
+        {"ds": row.day.isoformat(), "y": float(row.total)}
         for row in rows
         if row.day is not None
     ]
@@ -157,7 +157,7 @@ async def get_category_daily_expenses(db: AsyncSession, user_id: str, days: int
         select(
             Transaction.category,
             Transaction.transaction_date.label("day"),
-            func.sum(Transaction.amount).label("total")
+            func.abs(func.coalesce(func.sum(Transaction.amount), 0)).label("total")
         )
         .where(Transaction.user_id == user_id)
         .where(Transaction.category != "Income")
@@ -170,7 +170,7 @@ async def get_category_daily_expenses(db: AsyncSession, user_id: str, days: int
     rows = result.all()
     
     return [
-        {"category": row.category, "ds": row.day.isoformat(), "y": abs(float(row.total or 0))}
+        {"category": row.category, "ds": row.day.isoformat(), "y": float(row.total)}
         for row in rows
         if row.day is not None
     ]
@@ -1,46 +1,69 @@
 import logging
 import json
+import re
 import calendar
+from functools import lru_cache
 from decimal import Decimal
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Dict, Any, Tuple
-import pandas as pd
-import numpy as np
-
-try:
-    import sklearn
-    from lightgbm import LGBMRegressor
-    LIGHTGBM_AVAILABLE = True
-except ImportError:
-    LIGHTGBM_AVAILABLE = False
-    LGBMRegressor = None
+from typing import List, Optional, Dict, Any, Tuple, TYPE_CHECKING
 
 from fastapi import Depends
 from app.core.config import get_settings
 from app.features.forecasting.schemas import ForecastResponse, CategoryForecast
 from app.core.llm import get_llm_service, LLMService
 
+if TYPE_CHECKING:
+    # pandas/numpy are imported inside the forecasting functions so app startup doesn't pay for them
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-RECURRING_KEYWORDS = {
+RECURRING_KEYWORDS = frozenset({
     'rent', 'emi', 'subscription', 'sip', 'maintenance', 
     'insurance', 'bill', 'utility', 'electricity', 'recurring', 
     'recharge', 'broadband', 'wifi', 'mortgage', 'loan'
-}
-
+})
+
+@lru_cache(maxsize=1)
+def _load_lgbm_regressor():
+    """LightGBM (and scikit-learn behind it) is imported on the first forecast, not at app startup."""
+    try:
+        import sklearn
+        from lightgbm import LGBMRegressor
+        return LGBMRegressor
+    except ImportError:
+        return None
+
+# Single alternation over all keywords: one C-level scan per text instead of one `in` per keyword
+_RECURRING_RE = re.compile('|'.join(re.escape(kw) for kw in RECURRING_KEYWORDS))
+
+@lru_cache(maxsize=4096)
 def is_recurring(text: str) -> int:
     if not text:
         return 0
     text_lower = str(text).lower()
-    return 1 if any(kw in text_lower for kw in RECURRING_KEYWORDS) else 0
+    return 1 if _RECURRING_RE.search(text_lower) else 0
+
+# Record separator: never part of a keyword, so a match can't straddle two joined texts
+_BATCH_SEP = "\x1e"
+
+def has_recurring_signal(*texts) -> int:
+    """
+    Batch form of is_recurring: one scan over all texts joined together instead of one call per text.
+    The joined text is unique per user/month, so it bypasses the is_recurring LRU rather than filling it.
+    """
+    joined = _BATCH_SEP.join(str(t) for t in texts if t)
+    return 1 if _RECURRING_RE.search(joined.lower()) else 0
 
 
 class LightGBMForecaster:
     """Hybrid Personal Finance Forecaster using Deterministic Recurring Detection + Regularized LightGBM/EWMA Ensemble."""
 
     @staticmethod
-    def prepare_data(raw_transactions: List[dict]) -> pd.DataFrame:
+    def prepare_data(raw_transactions: List[dict]) -> "pd.DataFrame":
+        import pandas as pd
+
         if not raw_transactions:
             return pd.DataFrame()
 
@@ -81,6 +104,9 @@ class LightGBMForecaster:
         target_year: int, 
         target_month: int
     ) -> Tuple[Decimal, List[CategoryForecast], str]:
+        import numpy as np
+        import pandas as pd
+
         df_raw = cls.prepare_data(raw_transactions)
         if df_raw.empty:
             return Decimal("0.00"), [], "No historical transaction data available."
@@ -127,11 +153,7 @@ class LightGBMForecaster:
 
             spend_by_period = sub_df.set_index('period_dt')['amount'].to_dict()
 
-            rec_flag = int(
-                is_recurring(cat) or is_recurring(subcat) or 
-                any(is_recurring(m) for m in sub_df['merchant_name']) or 
-                any(is_recurring(r) for r in sub_df['remarks'])
-            )
+            rec_flag = has_recurring_signal(cat, subcat, *sub_df['merchant_name'], *sub_df['remarks'])
 
             for p_dt in all_periods:
                 # Require at least 3 months lag depth to prevent synthetic zero inflation
@@ -233,11 +255,7 @@ class LightGBMForecaster:
             ewma_val = float(full_series.ewm(span=3, adjust=False).mean().iloc[-1]) if not full_series.empty else 0.0
             ewma_dict[(cat, subcat)] = ewma_val
 
-            rec_flag = int(
-                is_recurring(cat) or is_recurring(subcat) or 
-                any(is_recurring(m) for m in sub_df['merchant_name']) or 
-                any(is_recurring(r) for r in sub_df['remarks'])
-            )
+            rec_flag = has_recurring_signal(cat, subcat, *sub_df['merchant_name'], *sub_df['remarks'])
 
             p_1m = target_dt - pd.DateOffset(months=1)
             p_2m = target_dt - pd.DateOffset(months=2)
@@ -319,12 +337,13 @@ class LightGBMForecaster:
         # Fit regularized LightGBM on small dataset
         lgb_preds_map: Dict[Tuple[str, str], float] = {}
 
-        if LIGHTGBM_AVAILABLE and not train_df.empty and len(train_df['period_dt'].unique()) >= 2:
+        regressor_cls = _load_lgbm_regressor()
+        if regressor_cls is not None and not train_df.empty and len(train_df['period_dt'].unique()) >= 2:
             try:
                 X_train = train_df[feature_cols]
                 y_train = train_df['amount']
 
-                model = LGBMRegressor(
+                model = regressor_cls(
                     n_estimators=40,          # Reduced trees to prevent overfitting small sample size
                     learning_rate=0.05,
                     max_depth=3,              # Shallow tree depth for small datasets
@@ -406,11 +425,13 @@ class LightGBMForecaster:
     @classmethod
     def _fallback_forecast(
         cls, 
-        df_raw: pd.DataFrame, 
+        df_raw: "pd.DataFrame", 
         target_year: int, 
         target_month: int
     ) -> Tuple[Decimal, List[CategoryForecast], str]:
         """Fallback forecast using recent 3-month moving average per category/subcategory."""
+        import pandas as pd
+
         if df_raw.empty:
             return Decimal("0.00"), [], "No transaction data."
 
@@ -487,7 +508,7 @@ class ForecastingService:
                 amount=total_amount,
                 reason=f"Tabular ML forecast ({method_reason}) for {len(breakdown)} categories/subcategories.",
                 time_frame=time_frame_str,
-                confidence="high" if LIGHTGBM_AVAILABLE else "medium",
+                confidence="high" if _load_lgbm_regressor() is not None else "medium",
                 breakdown=breakdown
             )
 
@@ -515,6 +536,7 @@ class ForecastingService:
             )
 
         try:
+            import pandas as pd
             df = pd.DataFrame(category_daily_history)
             category_totals = df.groupby('category')['y'].sum().to_dict() if 'y' in df.columns else {}
             recent_daily = df.groupby('ds')['y'].sum().tail(90).to_dict() if 'ds' in df.columns and 'y' in df.columns else {}
@@ -569,6 +591,7 @@ class ForecastingService:
             return default_result
         
         try:
+            import pandas as pd
             df = pd.DataFrame(history_data)
             val_col = 'y' if 'y' in df.columns else ('amount' if 'amount' in df.columns else None)
             if val_col:
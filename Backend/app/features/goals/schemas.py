@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 from typing import Optional
 from uuid import UUID
@@ -24,8 +24,7 @@ class GoalResponse(GoalBase):
     current_saved: float
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class FeasibilityCheck(BaseModel):
     is_feasible: bool
@@ -1,13 +1,15 @@
+import heapq
+import time
 import uuid
 import logging
 from typing import List, Optional
 from datetime import datetime, timedelta
-from sqlalchemy import select, and_
+from sqlalchemy import and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
 from app.core.database import get_db
-from app.core.email import send_email
+from app.core.email import send_email_async
 from app.core.config import get_settings
 from app.core.llm import get_llm_service, LLMService
 from app.features.auth.models import User
@@ -17,7 +19,24 @@ from app.features.transactions.models import Transaction, TransactionStatus
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+def _inr(value) -> str:
+    """₹ with paise, e.g. ₹1,234.50."""
+    return "₹" + format(float(value), ",.2f")
+
+def _inr0(value) -> str:
+    """Whole-rupee ₹ for compact breakdowns, e.g. ₹1,235."""
+    return "₹" + format(float(value), ",.0f")
+
 class NotificationService:
+    # Class-level cache for LLM blurbs shared across users: (kind, topic, bucket) -> (timestamp, text)
+    _llm_cache = {}
+    LLM_CACHE_TTL = 3600 # 1 hour
+    LLM_CACHE_MAX_SIZE = 1024
+    NAME_PLACEHOLDER = "{name}"
+    # Below these, the static copy is good enough and the LLM call isn't worth its latency
+    ROAST_MIN_INCREASE_PCT = 20.0
+    NUDGE_MIN_DAYS_INACTIVE = 7
+
     def __init__(self, db: AsyncSession = Depends(get_db), llm: LLMService = Depends(get_llm_service)):
         self.db = db
         # If instantiated manually (e.g. in scheduler), llm will be the Depends object
@@ -27,11 +46,55 @@ class NotificationService:
         else:
             from app.core.llm import get_llm_service
             self.llm = get_llm_service()
+        # Optional monotonic deadline shared by a batch of sends (see start_llm_budget)
+        self.llm_deadline: Optional[float] = None
+
+    def start_llm_budget(self, seconds: float):
+        """
+        Cap the total wall-clock a batch may spend waiting on the LLM.
+        Once exceeded, remaining sends fall back to their static copy.
+        """
+        self.llm_deadline = time.monotonic() + seconds
+
+    def _llm_within_budget(self) -> bool:
+        if not self.llm.is_enabled:
+            return False
+        if self.llm_deadline is not None and time.monotonic() > self.llm_deadline:
+            logger.info("Notification LLM budget exhausted. Using static copy.")
+            return False
+        return True
 
     def _derive_name(self, email: str, full_name: Optional[str] = None) -> str:
         if full_name:
             return full_name
-        return email.split('@')[0].replace('.', ' ').title()
+        return email.partition('@')[0].replace('.', ' ').title()
+
+    async def _get_recipient(self, user_id: uuid.UUID) -> Optional[User]:
+        """
+        Resolve the recipient before any LLM call or HTML rendering happens,
+        so inactive or email-less users cost a single lookup.
+        """
+        user = await self.db.get(User, user_id)
+        if not user or not user.email or not user.is_active:
+            return None
+        return user
+
+    def _get_cached_blurb(self, key: tuple, name: str) -> Optional[str]:
+        """Return a cached LLM blurb for this bucket, personalised for the recipient."""
+        entry = NotificationService._llm_cache.get(key)
+        if not entry:
+            return None
+        ts, text = entry
+        if (time.time() - ts) >= self.LLM_CACHE_TTL:
+            NotificationService._llm_cache.pop(key, None)
+            return None
+        return text.replace(self.NAME_PLACEHOLDER, name)
+
+    def _set_cached_blurb(self, key: tuple, text: str):
+        if len(NotificationService._llm_cache) >= self.LLM_CACHE_MAX_SIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            NotificationService._llm_cache.pop(next(iter(NotificationService._llm_cache)))
+        NotificationService._llm_cache[key] = (time.time(), text)
 
     def _get_html_wrapper(self, title: str, content: str, cta_text: Optional[str] = None, cta_url: Optional[str] = None, footer_note: Optional[str] = None) -> str:
         """Premium 'Grip Neon' design system for high-impact emails."""
@@ -103,7 +166,7 @@ class NotificationService:
             cta_url=f"{settings.FRONTEND_ORIGIN}/sync",
             footer_note="If you didn't expect this, it might be due to Google's security policy for applications in testing mode."
         )
-        send_email(email, subject, html)
+        await send_email_async(email, subject, html)
 
     async def send_welcome_email(self, email: str, full_name: Optional[str] = None):
         """Send a witty, high-premium welcome email to new users."""
@@ -112,7 +175,7 @@ class NotificationService:
         
         welcome_message = f"Welcome to {settings.APP_NAME}. You've just taken the first step toward absolute financial sovereignty. Your inbox is now your intelligence hub."
         
-        if self.llm.is_enabled:
+        if self._llm_within_budget():
             prompt = f"""
             Task: Write a witty, premium welcome message for {name}. 
             Context: They just joined Grip, an autonomous financial intelligence hub.
@@ -137,13 +200,12 @@ class NotificationService:
             cta_text="Enter Dashboard",
             cta_url=f"{settings.FRONTEND_ORIGIN}/dashboard"
         )
-        send_email(email, subject, html)
+        await send_email_async(email, subject, html)
 
     async def send_surety_reminder(self, user_id: uuid.UUID, full_name: str, bill_title: str, amount: float, due_date: datetime):
         """Send a reminder before a fixed obligation (surety) is due."""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user or not user.email: return
+        user = await self._get_recipient(user_id)
+        if not user: return
 
         import zoneinfo
         tz = zoneinfo.ZoneInfo(settings.APP_TIMEZONE)
@@ -164,13 +226,14 @@ class NotificationService:
         else:
             subject = f"Reminder: Payment Due for {bill_title}"
             
+        amount_str = _inr(abs(amount))
         reminder_message = f"Your recurring payment for {bill_title} is due {due_str}."
         
-        if self.llm.is_enabled:
+        if self._llm_within_budget():
             prompt = f"""
             Persona: Sassy, witty, premium personal CFO.
             Task: Write a reminder message for {name} regarding their upcoming payment.
-            Context: The payment for '{bill_title}' of amount ₹{abs(amount):,.2f} is due {due_str} (on {due_date.strftime('%d %B, %Y')}).
+            Context: The payment for '{bill_title}' of amount {amount_str} is due {due_str} (on {due_date.strftime('%d %B, %Y')}).
             - Max 30 words. No quotes, no markdown.
             - Be cheeky or witty. Example: 'Grip protocol check, {name}: your rent is due soon. Make sure your account is fueled so you keep a roof over your head.'
             """
@@ -185,7 +248,7 @@ class NotificationService:
         </div>
         <div style="background: #f8fafc; padding: 25px; border-radius: 12px; margin: 25px 0; border: 1px solid #f1f5f9; text-align: center;">
             <p style="margin: 0; font-size: 14px; text-transform: uppercase; color: #64748b; letter-spacing: 0.05em;">Amount Due</p>
-            <p style="margin: 5px 0; font-size: 32px; font-weight: 800; color: #1e293b;">₹{abs(amount):,.2f}</p>
+            <p style="margin: 5px 0; font-size: 32px; font-weight: 800; color: #1e293b;">{amount_str}</p>
             <p style="margin: 10px 0 0 0; font-size: 16px; color: #475569;">Due on <strong>{due_date.strftime('%d %B, %Y')}</strong></p>
         </div>
         <p>Ensure you have sufficient funds to avoid any late fees.</p>
@@ -196,30 +259,39 @@ class NotificationService:
             cta_text="View Obligations",
             cta_url=f"{settings.FRONTEND_ORIGIN}/transactions?view=custom&category=Bills"
         )
-        send_email(user.email, subject, html)
+        await send_email_async(user.email, subject, html)
 
     async def send_spending_insight(self, user_id: uuid.UUID, full_name: str, category: str, amount: float, percentage_increase: float):
         """Notify user about abnormal spending patterns with a cheeky 'Roast'."""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user or not user.email: return
+        user = await self._get_recipient(user_id)
+        if not user: return
 
         name = self._derive_name(user.email, full_name)
         subject = f"Category Alert: Your {category} spend is getting loud"
         
         roast_message = f"We noticed that your spending in {category} is {percentage_increase:.1f}% higher than your usual average this month."
         
-        if self.llm.is_enabled:
-            prompt = f"""
-            Persona: Sassy, witty, premium personal CFO.
-            Task: Write a funny, slightly brutal 'Roast' for {name} regarding their {category} spending.
-            Context: They spent ₹{amount:,.0f} this week, which is {percentage_increase:.1f}% higher than normal.
-            - Max 30 words. No quotes, no markdown.
-            - Be cheeky. Example: 'Your coffee budget is starting to look like a down payment on a house, {name}. Maybe it's time to learn how a kettle works?'
-            """
-            resp = await self.llm.generate_response(prompt, temperature=0.8, timeout=60.0)
-            if resp:
-                roast_message = resp.strip()
+        if percentage_increase >= self.ROAST_MIN_INCREASE_PCT and self._llm_within_budget():
+            # Roasts are bucketed by category and ~10% increase steps so one generation serves many users
+            increase_bucket = int(round(percentage_increase / 10) * 10)
+            cache_key = ("roast", category, increase_bucket)
+            cached = self._get_cached_blurb(cache_key, name)
+            if cached:
+                roast_message = cached
+            else:
+                prompt = f"""
+                Persona: Sassy, witty, premium personal CFO.
+                Task: Write a funny, slightly brutal 'Roast' for a user regarding their {category} spending.
+                Context: Their {category} spend this week is about {increase_bucket}% higher than normal.
+                - Refer to the user ONLY as {self.NAME_PLACEHOLDER} (keep the braces exactly as written).
+                - Max 30 words. No quotes, no markdown.
+                - Be cheeky. Example: 'Your coffee budget is starting to look like a down payment on a house, {self.NAME_PLACEHOLDER}. Maybe it's time to learn how a kettle works?'
+                """
+                resp = await self.llm.generate_response(prompt, temperature=0.8, timeout=60.0)
+                if resp:
+                    template = resp.strip()
+                    self._set_cached_blurb(cache_key, template)
+                    roast_message = template.replace(self.NAME_PLACEHOLDER, name)
 
         content = f"""
         <p>Hello {name},</p>
@@ -237,24 +309,24 @@ class NotificationService:
             cta_text="Review Transactions",
             cta_url=f"{settings.FRONTEND_ORIGIN}/analytics"
         )
-        send_email(user.email, subject, html)
+        await send_email_async(user.email, subject, html)
 
     async def send_weekly_summary(self, user_id: uuid.UUID, full_name: str, categories_data: List[dict]):
         """Send a consolidated weekly spending roast for multiple categories."""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user or not user.email: return
+        user = await self._get_recipient(user_id)
+        if not user: return
 
         name = self._derive_name(user.email, full_name)
         subject = f"Weekly Recap: Your wallet has some explaining to do"
         
         # Prepare context for LLM
-        context_items = [f"{item['category']}: ₹{item['amount']:,.0f}" for item in categories_data]
+        amount_strs = [_inr0(item['amount']) for item in categories_data]
+        context_items = [f"{item['category']}: {amount_str}" for item, amount_str in zip(categories_data, amount_strs)]
         context_str = "\n".join(context_items)
         
         roast_message = f"You had some significant spending this week in {', '.join([item['category'] for item in categories_data])}. Keep an eye on your budget!"
         
-        if self.llm.is_enabled:
+        if self._llm_within_budget():
             prompt = f"""
             Persona: Sassy, witty, premium personal CFO.
             Task: Write a funny, slightly brutal consolidated 'Roast' for {name} based on their weekly spending across multiple categories.
@@ -269,14 +341,15 @@ class NotificationService:
                 roast_message = resp.strip().replace('"', '')
 
         # Build category breakdown HTML
-        breakdown_html = ""
-        for item in categories_data:
-            breakdown_html += f"""
+        breakdown_rows = []
+        for item, amount_str in zip(categories_data, amount_strs):
+            breakdown_rows.append(f"""
             <div style="background: #f8fafc; padding: 15px; border-radius: 12px; border: 1px solid #f1f5f9; display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
                 <span style="font-size: 14px; color: #64748b;">{item['category']}:</span>
-                <span style="font-size: 18px; font-weight: 700; color: #ef4444;">₹{item['amount']:,.0f}</span>
+                <span style="font-size: 18px; font-weight: 700; color: #ef4444;">{amount_str}</span>
             </div>
-            """
+            """)
+        breakdown_html = "".join(breakdown_rows)
 
         content = f"""
         <p>Hello {name},</p>
@@ -292,13 +365,12 @@ class NotificationService:
             cta_text="Review Dashboard",
             cta_url=f"{settings.FRONTEND_ORIGIN}/dashboard"
         )
-        send_email(user.email, subject, html)
+        await send_email_async(user.email, subject, html)
 
     async def send_buffer_alert(self, user_id: uuid.UUID, full_name: str, safe_to_spend: float):
         """Emergency alert when Safe-to-Spend drops into the danger zone."""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user or not user.email: return
+        user = await self._get_recipient(user_id)
+        if not user: return
 
         name = self._derive_name(user.email, full_name)
         subject = "🚨 Red Alert: Buffer Exhausted"
@@ -321,30 +393,92 @@ class NotificationService:
             cta_text="Check Damage",
             cta_url=f"{settings.FRONTEND_ORIGIN}/dashboard"
         )
-        send_email(user.email, subject, html)
+        await send_email_async(user.email, subject, html)
+
+    def _nudge_prompt(self, days_inactive: int) -> str:
+        return f"""
+        Persona: Sassy, witty, premium personal CFO. 
+        Task: Write a funny, slightly flirty/teasing nudge for a user who hasn't synced their bank in {days_inactive} days.
+        - Refer to the user ONLY as {self.NAME_PLACEHOLDER} (keep the braces exactly as written).
+        - Tease them about their 'ghosting' skills or 'selective memory' regarding spending.
+        - Max 30 words. 
+        - No quotes, no markdown.
+        Example: "Ghosting your finances doesn't make the bills go away, {self.NAME_PLACEHOLDER}. Reconnect before your budget has an identity crisis."
+        """
+
+    def _weekend_prompt(self, name: str, safe_to_spend: float, top_category: Optional[str]) -> str:
+        context_str = f"Top Spend this week: {top_category}" if top_category else ""
+        return f"""
+        Persona: Witty, premium, world-class lifestyle concierge.
+        Context: User {name} has ₹{safe_to_spend:,.0f} safe to spend. {context_str}.
+        
+        Task: Write a highly personal, cheeky weekend recommendation. 
+        - If {top_category} is 'Food': Tease their palate. 
+        - If Budget > 3k: Suggest a 'treat yourself' moment.
+        - If Budget < 3k and > 1k: Suggest something in the middle.
+        - If Budget < 1k: Suggest something 'poor but gold' like a park sunset with stolen office coffee.
+        - Mood: Sophisticated but funny. Use wordplay. 
+        
+        Return JSON only, NO markdown:
+        {{ "headline": "Witty headline", "message": "The suggestion", "cta": "Cheeky CTA", "subject": "Bait-y subject line" }}
+        """
 
-    async def send_inactivity_nudge(self, user_id: uuid.UUID, full_name: str, days_inactive: int):
+    async def prepare_lifestyle_copy(
+        self,
+        user_id: uuid.UUID,
+        full_name: str,
+        days_inactive: Optional[int] = None,
+        safe_to_spend: Optional[float] = None,
+        top_category: Optional[str] = None
+    ) -> dict:
+        """
+        When a user is due both an inactivity nudge and a weekend insight in the same
+        pass, generate both blurbs with one LLM call. Returns {"nudge": str, "weekend": dict}
+        (either may be missing); an empty dict means each send_* should generate its own.
+        """
+        if days_inactive is None or safe_to_spend is None or days_inactive < self.NUDGE_MIN_DAYS_INACTIVE:
+            return {}
+        if not self._llm_within_budget():
+            return {}
+        user = await self._get_recipient(user_id)
+        if not user:
+            return {}
+
+        name = self._derive_name(user.email, full_name)
+        data = await self.llm.generate_json_multi({
+            "nudge": self._nudge_prompt(days_inactive),
+            "weekend": self._weekend_prompt(name, safe_to_spend, top_category)
+        }, temperature=0.8, timeout=60.0)
+
+        copy = {}
+        if isinstance(data.get("nudge"), str) and data["nudge"].strip():
+            copy["nudge"] = data["nudge"].strip().replace('"', '')
+        if isinstance(data.get("weekend"), dict):
+            copy["weekend"] = data["weekend"]
+        return copy
+
+    async def send_inactivity_nudge(self, user_id: uuid.UUID, full_name: str, days_inactive: int, ai_message: Optional[str] = None):
         """Notify user if no transactions have been synced for a while."""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user or not user.email: return
+        user = await self._get_recipient(user_id)
+        if not user: return
 
         name = self._derive_name(user.email, full_name)
         subject = f"We missed you, {name}!"
         nudge_message = f"It has been {days_inactive} days since your last transaction was synced. Financial intelligence works best with fresh data!"
         
-        if self.llm.is_enabled:
-            prompt = f"""
-            Persona: Sassy, witty, premium personal CFO. 
-            Task: Write a funny, slightly flirty/teasing nudge for {name} who hasn't synced their bank in {days_inactive} days.
-            - Tease them about their 'ghosting' skills or 'selective memory' regarding spending.
-            - Max 30 words. 
-            - No quotes, no markdown.
-            Example: "Ghosting your finances doesn't make the bills go away, {name}. Reconnect before your budget has an identity crisis."
-            """
-            resp = await self.llm.generate_response(prompt, temperature=0.7, timeout=60.0)
-            if resp:
-                nudge_message = resp.strip().replace('"', '')
+        if ai_message:
+            nudge_message = ai_message.replace(self.NAME_PLACEHOLDER, name)
+        elif days_inactive >= self.NUDGE_MIN_DAYS_INACTIVE and self._llm_within_budget():
+            cache_key = ("nudge", None, days_inactive)
+            cached = self._get_cached_blurb(cache_key, name)
+            if cached:
+                nudge_message = cached
+            else:
+                resp = await self.llm.generate_response(self._nudge_prompt(days_inactive), temperature=0.7, timeout=60.0)
+                if resp:
+                    template = resp.strip().replace('"', '')
+                    self._set_cached_blurb(cache_key, template)
+                    nudge_message = template.replace(self.NAME_PLACEHOLDER, name)
 
         content = f"<p>Hello {name},</p><p>{nudge_message}</p>"
         html = self._get_html_wrapper(
@@ -353,13 +487,12 @@ class NotificationService:
             cta_text="Sync Now",
             cta_url=f"{settings.FRONTEND_ORIGIN}/sync"
         )
-        send_email(user.email, subject, html)
+        await send_email_async(user.email, subject, html)
 
-    async def send_weekend_insight(self, user_id: uuid.UUID, full_name: str, safe_to_spend: float, current_balance: float, top_category: Optional[str] = None):
+    async def send_weekend_insight(self, user_id: uuid.UUID, full_name: str, safe_to_spend: float, current_balance: float, top_category: Optional[str] = None, ai_data: Optional[dict] = None):
         """Send a personalized, AI-generated weekend recommendation."""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user or not user.email: return
+        user = await self._get_recipient(user_id)
+        if not user: return
 
         name = self._derive_name(user.email, full_name)
         ai_headline = "Ready for the Weekend?"
@@ -367,28 +500,14 @@ class NotificationService:
         ai_cta = "Check Budget"
         subject = f"Weekend Insight: ₹{safe_to_spend:,.0f}"
 
-        if self.llm.is_enabled:
-            context_str = f"Top Spend this week: {top_category}" if top_category else ""
-            prompt = f"""
-            Persona: Witty, premium, world-class lifestyle concierge.
-            Context: User {name} has ₹{safe_to_spend:,.0f} safe to spend. {context_str}.
-            
-            Task: Write a highly personal, cheeky weekend recommendation. 
-            - If {top_category} is 'Food': Tease their palate. 
-            - If Budget > 3k: Suggest a 'treat yourself' moment.
-            - If Budget < 3k and > 1k: Suggest something in the middle.
-            - If Budget < 1k: Suggest something 'poor but gold' like a park sunset with stolen office coffee.
-            - Mood: Sophisticated but funny. Use wordplay. 
-            
-            Return JSON only, NO markdown:
-            {{ "headline": "Witty headline", "message": "The suggestion", "cta": "Cheeky CTA", "subject": "Bait-y subject line" }}
-            """
-            data = await self.llm.generate_json(prompt, temperature=0.8, timeout=60.0)
-            if data:
-                ai_headline = data.get("headline", ai_headline)
-                ai_message = data.get("message", ai_message)
-                ai_cta = data.get("cta", ai_cta)
-                subject = data.get("subject", subject)
+        data = ai_data
+        if not data and self._llm_within_budget():
+            data = await self.llm.generate_json(self._weekend_prompt(name, safe_to_spend, top_category), temperature=0.8, timeout=60.0)
+        if data:
+            ai_headline = data.get("headline", ai_headline)
+            ai_message = data.get("message", ai_message)
+            ai_cta = data.get("cta", ai_cta)
+            subject = data.get("subject", subject)
 
         content = f"""
         <p>Hello {name},</p>
@@ -406,43 +525,52 @@ class NotificationService:
             cta_url=f"{settings.FRONTEND_ORIGIN}/dashboard",
             footer_note="This figure accounts for your current balance minus all upcoming obligations and safety buffers."
         )
-        send_email(user.email, subject, html)
+        await send_email_async(user.email, subject, html)
 
     async def send_monthly_report(self, user_id: uuid.UUID, full_name: str, summary: any, variance: any):
         """Send a massive monthly intelligence report with AI recommendations and data breakdown."""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user or not user.email: return
+        user = await self._get_recipient(user_id)
+        if not user: return
 
         name = self._derive_name(user.email, full_name)
         subject = f"Monthly Intelligence: Your {summary.month} Review"
         
         # 1. Prepare visual breakdown (Top 5 categories)
-        sorted_cats = sorted(variance.category_breakdown.items(), key=lambda x: x[1].current, reverse=True)[:5]
-        breakdown_html = ""
+        sorted_cats = heapq.nlargest(5, variance.category_breakdown.items(), key=lambda x: x[1].current)
+        breakdown_rows = []
+        total_expense = float(summary.total_expense)
+        pct_scale = 100.0 / total_expense if total_expense > 0 else 0.0
+        cat_amounts = []
         for cat, data in sorted_cats:
-            percentage = (float(data.current) / float(summary.total_expense) * 100) if summary.total_expense > 0 else 0
-            breakdown_html += f"""
+            current = float(data.current)
+            percentage = current * pct_scale
+            amount_str = _inr0(current)
+            cat_amounts.append((cat, amount_str))
+            breakdown_rows.append(f"""
             <div style="margin-bottom: 20px;">
                 <div style="display: flex; justify-content: space-between; font-size: 14px; margin-bottom: 6px;">
                     <span style="color: #475569; font-weight: 600;">{cat}</span>
-                    <span style="color: #111; font-weight: 800;">₹{data.current:,.0f}</span>
+                    <span style="color: #111; font-weight: 800;">{amount_str}</span>
                 </div>
                 <div style="width: 100%; height: 8px; background: #f1f5f9; border-radius: 4px; overflow: hidden;">
                     <div style="width: {min(100, percentage)}%; height: 100%; background: #4F46E5; box-shadow: 0 0 10px rgba(79, 70, 229, 0.4);"></div>
                 </div>
             </div>
-            """
+            """)
+        breakdown_html = "".join(breakdown_rows)
+
+        income_str = _inr0(summary.total_income)
+        expense_str = _inr0(summary.total_expense)
 
         # 2. Get AI Strategic Nudge
         ai_strategy = "Great work tracking your finances this month. Keep it up for a stronger next month!"
-        if self.llm.is_enabled:
-            top_cats_str = ", ".join([f"{c}: ₹{d.current:,.0f}" for c, d in sorted_cats])
+        if self._llm_within_budget():
+            top_cats_str = ", ".join([f"{c}: {amount_str}" for c, amount_str in cat_amounts])
             prompt = f"""
             Persona: Sassy but brilliant luxury wealth manager.
             User: {name}
             Month: {summary.month}
-            Total Income: ₹{summary.total_income:,.0f}, Expenses: ₹{summary.total_expense:,.0f}
+            Total Income: {income_str}, Expenses: {expense_str}
             Top Spends: {top_cats_str}
             
             Task: Write a 2-3 sentence 'Optimization Strategy'. 
@@ -462,11 +590,11 @@ class NotificationService:
         <div style="display: flex; gap: 15px; margin: 30px 0;">
             <div style="flex: 1; background: #f8fafc; padding: 25px; border-radius: 20px; border: 1px solid #e2e8f0; text-align: center;">
                 <span style="display: block; font-size: 11px; text-transform: uppercase; color: #64748b; letter-spacing: 0.1em; margin-bottom: 8px; font-weight: 700;">Income</span>
-                <span style="font-size: 24px; font-weight: 900; color: #10b981;">₹{summary.total_income:,.0f}</span>
+                <span style="font-size: 24px; font-weight: 900; color: #10b981;">{income_str}</span>
             </div>
             <div style="flex: 1; background: #f8fafc; padding: 25px; border-radius: 20px; border: 1px solid #e2e8f0; text-align: center;">
                 <span style="display: block; font-size: 11px; text-transform: uppercase; color: #64748b; letter-spacing: 0.1em; margin-bottom: 8px; font-weight: 700;">Expenses</span>
-                <span style="font-size: 24px; font-weight: 900; color: #ef4444;">₹{summary.total_expense:,.0f}</span>
+                <span style="font-size: 24px; font-weight: 900; color: #ef4444;">{expense_str}</span>
             </div>
         </div>
 
@@ -492,4 +620,4 @@ class NotificationService:
             cta_url=f"{settings.FRONTEND_ORIGIN}/analytics",
             footer_note="Based on consolidated data from your synchronized bank accounts and manual entries."
         )
-        send_email(user.email, subject, html)
+        await send_email_async(user.email, subject, html)
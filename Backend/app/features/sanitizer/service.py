@@ -1,5 +1,8 @@
 import re
 
+# Common greeting removal (Dear Customer, Hello Name)
+GREETING_RE = re.compile(r'(?i)(Dear|Hello|Hi)\s+[A-Za-z\s]+,')
+
 class SanitizerService:
     def __init__(self):
         # Regex Patterns
@@ -15,21 +18,21 @@ class SanitizerService:
             'PAN': re.compile(r'[A-Z]{5}[0-9]{4}[A-Z]{1}'),
             'AADHAAR': re.compile(r'\d{4}\s\d{4}\s\d{4}'),
         }
+        # Skip generic number replacement (OTP) to avoid sanitizing amounts; the LLM is relied on
+        # to ignore OTPs instead. Pruned once here, with replacement labels prebuilt.
+        self._active_patterns = [
+            (pattern, f'<{label}>') for label, pattern in self.patterns.items() if label != 'OTP'
+        ]
+
     def sanitize(self, text: str) -> str:
         if not text:
             return text
             
         # Common greeting removal (Dear Customer, Hello Name)
-        text = re.sub(r'(?i)(Dear|Hello|Hi)\s+[A-Za-z\s]+,', r'\1 Customer,', text)
+        text = GREETING_RE.sub(r'\1 Customer,', text)
         
-        for label, pattern in self.patterns.items():
-            if label == 'OTP':
-                 # Skip generic number replacement to avoid sanitizing amounts, unless it clearly looks like an OTP
-                 # For now, let's rely on LLM to ignore OTPs, or be very strict.
-                 # Actually, better to NOT sanitize simple numbers blindly as they might be amounts.
-                 continue
-                 
-            text = pattern.sub(f'<{label}>', text)
+        for pattern, replacement in self._active_patterns:
+            text = pattern.sub(replacement, text)
             
         return text
 
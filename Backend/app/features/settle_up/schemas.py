@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from uuid import UUID
 from typing import Optional
 from datetime import date, datetime
@@ -10,8 +10,7 @@ class SettleUpEntryBase(BaseModel):
     remarks: Optional[str] = None
     date: Optional[date] = None
 
-    class Config:
-        str_strip_whitespace = True
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class SettleUpEntryCreate(SettleUpEntryBase):
     transaction_id: Optional[UUID] = None
@@ -22,8 +21,7 @@ class SettleUpEntryUpdate(BaseModel):
     remarks: Optional[str] = None
     date: Optional[date] = None
 
-    class Config:
-        str_strip_whitespace = True
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class SettleUpEntryResponse(SettleUpEntryBase):
     id: UUID
@@ -32,13 +30,11 @@ class SettleUpEntryResponse(SettleUpEntryBase):
     transaction_id: Optional[UUID] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PeerBalance(BaseModel):
     peer_name: str
     net_balance: Decimal
     last_activity_date: date
 
-    class Config:
-        str_strip_whitespace = True
+    model_config = ConfigDict(str_strip_whitespace=True)
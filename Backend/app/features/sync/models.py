@@ -1,12 +1,17 @@
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class SyncLog(Base):
     __tablename__ = "sync_logs"
+    __table_args__ = (
+        # Serves the "latest successful sync" lookups (sync window, sync status endpoints):
+        # equality on user_id/status, then newest start_time first via a backward index scan
+        Index("ix_sync_logs_user_status_start", "user_id", "status", "start_time"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"))
@@ -20,6 +25,8 @@ class SyncLog(Base):
     
     # Store the historyId used for this sync to know where to start next time
     history_id_used: Mapped[str] = mapped_column(String, nullable=True) 
-    summary: Mapped[str] = mapped_column(Text, nullable=True) # JSON summary of processed records
+    # JSON summary of processed records. Deferred: it is write-only for the API, so the
+    # history/status listings shouldn't pull the blob for every row they load
+    summary: Mapped[str] = mapped_column(Text, nullable=True, deferred=True)
 
     # Relationship to user if needed, or just ID
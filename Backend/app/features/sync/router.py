@@ -1,4 +1,5 @@
 from typing import Annotated
+import asyncio
 import logging
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Header, status
 from sqlalchemy import select, desc
@@ -10,7 +11,7 @@ from app.features.auth.deps import get_current_user
 from app.features.auth.models import User
 from app.features.sync.service import SyncService
 import base64
-import json
+import orjson
 from app.features.sync.models import SyncLog
 
 logger = logging.getLogger(__name__)
@@ -96,7 +97,7 @@ async def google_callback(
     try:
         # Fetch token using the authorization code
         logger.debug(f"Fetching token for code: {code[:10]}...")
-        flow.fetch_token(code=code)
+        await asyncio.to_thread(flow.fetch_token, code=code)
         creds = flow.credentials
         logger.info(f"Successfully fetched token for {current_user.email}")
         
@@ -119,8 +120,8 @@ async def google_callback(
         # PROACTIVE: Fetch user profile name if not already set
         try:
             from googleapiclient.discovery import build
-            user_info_service = build('oauth2', 'v2', credentials=creds)
-            user_info = user_info_service.userinfo().get().execute()
+            user_info_service = await asyncio.to_thread(build, 'oauth2', 'v2', credentials=creds)
+            user_info = await asyncio.to_thread(user_info_service.userinfo().get().execute)
             if user_info and user_info.get("name"):
                 db_user.full_name = user_info.get("name")
                 logger.info(f"Extracted name '{db_user.full_name}' from Google profile for {db_user.email}")
@@ -130,12 +131,12 @@ async def google_callback(
         # PROACTIVE: Setup Gmail Push Notifications
         if settings.GMAIL_PUBSUB_TOPIC:
             try:
-                gmail_service = build('gmail', 'v1', credentials=creds)
+                gmail_service = await asyncio.to_thread(build, 'gmail', 'v1', credentials=creds)
                 watch_request = {
                     'labelIds': ['INBOX'],
                     'topicName': settings.GMAIL_PUBSUB_TOPIC
                 }
-                watch_response = gmail_service.users().watch(userId='me', body=watch_request).execute()
+                watch_response = await asyncio.to_thread(gmail_service.users().watch(userId='me', body=watch_request).execute)
                 logger.info(f"Successfully enabled Gmail push notifications for {db_user.email}. HistoryId: {watch_response.get('historyId')}")
             except Exception as watch_ex:
                 logger.warning(f"Failed to enable Gmail push notifications for {db_user.email}: {watch_ex}")
@@ -170,8 +171,8 @@ async def webhook_ingress(
         return {"status": "ignored"}
         
     try:
-        data_str = base64.b64decode(data_b64).decode("utf-8")
-        data_json = json.loads(data_str)
+        # orjson parses the decoded bytes directly (UTF-8 validated), no intermediate str
+        data_json = orjson.loads(base64.b64decode(data_b64))
         email = data_json.get("emailAddress")
         historyId = data_json.get("historyId")
         logger.info(f"Webhook decoded for email: {email}, historyId: {historyId}")
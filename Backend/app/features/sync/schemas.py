@@ -0,0 +1,38 @@
+from pydantic import BaseModel, AliasChoices, Field, field_validator
+from typing import Optional, Literal
+
+class TxnExtraction(BaseModel):
+    """LLM extraction for one bank notification. Its JSON schema also constrains local decoding."""
+    is_transaction: bool = False
+    amount: float = 0.0
+    currency: str = "INR"
+    merchant_name: str = Field(default="UNKNOWN", validation_alias=AliasChoices("merchant_name", "merchant"))
+    category: str = "Uncategorized"
+    sub_category: str = "Uncategorized"
+    account_type: Literal["SAVINGS", "CREDIT_CARD", "CASH"] = "SAVINGS"
+    transaction_type: Literal["DEBIT", "CREDIT"] = "DEBIT"
+    extracted_date: Optional[str] = None
+
+    @field_validator('amount', mode='before')
+    @classmethod
+    def parse_amount(cls, v):
+        if v is None or v == "":
+            return 0.0
+        if isinstance(v, str):
+            return v.replace(',', '').replace('₹', '').strip() or 0.0
+        return v
+
+    @field_validator('currency', 'merchant_name', 'category', 'sub_category', mode='before')
+    @classmethod
+    def default_if_blank(cls, v, info):
+        # Models sometimes emit null/"" instead of omitting a field
+        if v is None or (isinstance(v, str) and not v.strip()):
+            return cls.model_fields[info.field_name].default
+        return v
+
+    @field_validator('account_type', 'transaction_type', mode='before')
+    @classmethod
+    def default_if_unknown(cls, v, info):
+        allowed = cls.model_fields[info.field_name].annotation.__args__
+        v = str(v or "").strip().upper()
+        return v if v in allowed else cls.model_fields[info.field_name].default
@@ -3,9 +3,10 @@ import hashlib
 import re
 import uuid
 import logging
-import json
+import orjson
 import base64
-from datetime import datetime, timedelta
+import html
+from datetime import date, datetime, timedelta, timezone
 from typing import Optional, List
 from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,8 +23,8 @@ from app.features.transactions.service import TransactionService
 from app.features.sanitizer.service import get_sanitizer_service
 from app.features.transactions.models import TransactionStatus
 from app.features.sync.models import SyncLog
+from app.features.sync.schemas import TxnExtraction
 from app.features.auth.models import User
-from app.features.categories.models import SubCategory
 from app.features.categories.service import CategoryService
 from app.features.wealth.service import WealthService
 from app.features.notifications.service import NotificationService
@@ -32,13 +33,95 @@ from app.core.llm import get_llm_service, LLMService
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Email compression patterns, compiled once at import instead of per email / per line
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_MULTI_NEWLINE_RE = re.compile(r'[\r\n]{2,}')
+_MULTI_SPACE_RE = re.compile(r'[ \t]{2,}')
+_DASH_RUN_RE = re.compile(r'-{3,}')
+_DOT_RUN_RE = re.compile(r'\.{3,}')
 
+# Standard low-information bank boilerplate phrases to discard, fused into a single
+# alternation so each line is scanned once rather than once per phrase
+_BOILERPLATE_RE = re.compile('|'.join([
+    r'If this transaction was not initiated by you',
+    r'To block (?:your|UPI|Card)',
+    r'Call us at',
+    r'Always open to help you',
+    r'This is an auto-generated',
+    r'Kindly do not reply',
+    r'Download our app',
+    r'For details on the transaction',
+    r'Important notice:',
+    r'Register for',
+    r'Please note that',
+    r'You are eligible for',
+    r'Pre-approved (?:loan|card|limit)',
+    r'Cashback offer',
+    r'Reward points',
+    r'Enjoy (?:benefits|discounts)'
+]), re.IGNORECASE)
+
+# Lines carrying any of these "signal" tokens are always preserved
+_SIGNAL_RE = re.compile('|'.join([
+    r'(?:Rs\.?|INR|₹)\s*[\d,]+', # Amount
+    r'UPI/(?:P2P|P2M)/',        # UPI Path
+    r'[a-zA-Z0-9.\-_]{2,}@[a-zA-Z]{2,}', # UPI ID
+    r'(?:Spent|Debited|Credited|Transferred|Paid)', # Verbs
+    r'\d{2}[-/]\d{2}[-/]\d{2,4}', # Dates
+    r'VPA|Merchant|Ref No|Txn ID|Order|Booking|Invoice|Billing|Reference|Thank you for' # Identifiers and human indicators
+]), re.IGNORECASE)
+
+# Cheap gate ahead of the LLM: an email with no currency amount and no money-movement
+# word cannot describe a transaction, so it never needs an inference slot
+_TXN_SIGNAL_RE = re.compile('|'.join([
+    r'(?:Rs\.?|INR|₹|USD|\$|EUR|€|GBP|£)\s*\d',
+    r'debit|credit|spent|paid|txn|transaction|upi|withdraw|transfer|purchase|received|refund'
+]), re.IGNORECASE)
+
+# Regex fallback extractor patterns (used when the LLM cannot extract a transaction)
+# The currency-amount pattern spells out its case variants instead of using re.IGNORECASE,
+# which measurably speeds up scanning long bodies; the word patterns keep re.IGNORECASE
+# because their casing varies too much across bank templates to enumerate.
+_FALLBACK_AMOUNT_RE = re.compile(r'(?:[Rr][Ss]\.?|[Ii][Nn][Rr]|₹)\s*([\d,]+\.?\d*)')
+_FALLBACK_CREDIT_RE = re.compile(r'\b(?:credited|received|deposit)\b', re.IGNORECASE)
+_FALLBACK_UPI_PATH_RE = re.compile(r'UPI/(?:P2P|P2M)/[^/\r\n]+/([^/\r\n]+?)(?:/|\r|\n|$)', re.IGNORECASE)
+_FALLBACK_UPI_ID_RE = re.compile(r'\b([a-zA-Z0-9.\-_]{2,}@[a-zA-Z]{2,})\b')
+
+# Template cache: emails whose text differs only in numbers share one LLM extraction
+_NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+_TEMPLATE_DATE_RE = re.compile(r'\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}[-/ ](?:\d{1,2}|[A-Za-z]{3})[-/ ]\d{2,4}\b')
+
+# Merchant names the extractors emit when no real merchant was found
+_PLACEHOLDER_MERCHANTS = frozenset({"UNKNOWN", "UNCATEGORIZED"})
 
 class SyncService:
     # Class-level tracker for active sync tasks per user (debouncing and running)
     _active_syncs = set()
+    RUNNING_SYNC_TIMEOUT = 600 # IN_PROGRESS logs older than this (seconds) are treated as abandoned
     _trends_cache = {} # user_id -> (timestamp, data)
+    # Start time of each user's last productive sync, kept current by _log_end so the
+    # window lookup only hits SyncLog once per process. Another worker's newer sync can
+    # only make this older, i.e. widen the window, which dedup absorbs.
+    _last_sync_cache = {} # user_id -> datetime
     TRENDS_CACHE_TTL = 600 # 10 minutes
+    # Extraction results for emails the LLM already answered. Non-transaction and
+    # failed emails are never stored as transactions, so overlapping sync windows
+    # would otherwise re-send them to the LLM on every sync.
+    _extraction_cache = {} # digest -> (timestamp, extracted)
+    # Same idea keyed on the digit-stripped text: repeat alerts from one bank template
+    # reuse the extraction with the live amount/date re-read from their slot in the email
+    _template_cache = {} # digest -> (timestamp, (extracted | None, amount_slot, date_slot))
+    EXTRACTION_CACHE_TTL = 86400 # 24 hours
+    EXTRACTION_CACHE_MAX_SIZE = 2048
+    # Credentials + discovery-built Gmail client per user, reused while the stored token is unchanged
+    _gmail_service_cache = {} # user_id -> (timestamp, token, creds, service)
+    GMAIL_SERVICE_CACHE_TTL = 1800 # 30 minutes
+    GMAIL_SERVICE_CACHE_MAX_SIZE = 1000
+    # raw_content_hash values known to be stored, so overlapping sync windows can dedup
+    # the same messages without re-querying transactions
+    _known_hash_cache = {} # content_hash -> timestamp
+    KNOWN_HASH_CACHE_TTL = 3600 # 1 hour
+    KNOWN_HASH_CACHE_MAX_SIZE = 10000
 
     def __init__(self,                  db: AsyncSession = Depends(get_db), 
                  transaction_service: TransactionService = Depends(),
@@ -58,21 +141,37 @@ class SyncService:
         # Only use timestamp from syncs that actually processed records.
         # This prevents empty syncs (e.g. after reconnect) from pushing
         # the 'after:' window forward and missing all historical emails.
+        last_start = SyncService._last_sync_cache.get(user_id)
+        if last_start is None:
+            stmt = (
+                select(SyncLog.start_time)
+                .where(SyncLog.user_id == user_id)
+                .where(SyncLog.status == "SUCCESS")
+                .where(SyncLog.records_processed > 0)
+                .order_by(desc(SyncLog.start_time))
+                .limit(1)
+            )
+            result = await self.db.execute(stmt)
+            last_start = result.scalar_one_or_none()
+            if not last_start:
+                return None
+            SyncService._last_sync_cache[user_id] = last_start
+            
+        # Subtract 1 hour to have a small overlap and prevent boundary misses
+        return last_start - timedelta(hours=1)
+
+    async def _has_running_sync(self, user_id: uuid.UUID) -> bool:
+        # Logs stuck IN_PROGRESS (e.g. a worker died mid-sync) stop blocking after the timeout
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.RUNNING_SYNC_TIMEOUT)
         stmt = (
-            select(SyncLog)
+            select(SyncLog.id)
             .where(SyncLog.user_id == user_id)
-            .where(SyncLog.status == "SUCCESS")
-            .where(SyncLog.records_processed > 0)
-            .order_by(desc(SyncLog.start_time))
+            .where(SyncLog.status == "IN_PROGRESS")
+            .where(SyncLog.start_time > cutoff)
             .limit(1)
         )
         result = await self.db.execute(stmt)
-        log = result.scalar_one_or_none()
-        if not log:
-            return None
-            
-        # Subtract 1 hour to have a small overlap and prevent boundary misses
-        return log.start_time - timedelta(hours=1)
+        return result.scalar_one_or_none() is not None
 
     async def _log_start(self, user_id: uuid.UUID, source: str) -> SyncLog:
         log = SyncLog(user_id=user_id, trigger_source=source, status="IN_PROGRESS")
@@ -82,13 +181,16 @@ class SyncService:
         return log
 
     async def _log_end(self, log: SyncLog, status: str, count: int = 0, error: str = None, summary: List[dict] = None):
-        log.end_time = datetime.now()
+        log.end_time = datetime.now(timezone.utc)
         log.status = status
         log.records_processed = count
         log.error_message = error
         if summary:
-            log.summary = json.dumps(summary)
+            # orjson serialises the UUID ids natively and is several times faster than json.dumps
+            log.summary = orjson.dumps(summary, default=str).decode()
         await self.db.commit()
+        if status == "SUCCESS" and count > 0:
+            SyncService._last_sync_cache[log.user_id] = log.start_time
 
     def _compress_email_body(self, text: str) -> str:
         """
@@ -99,44 +201,15 @@ class SyncService:
             return ""
         
         # 1. Normalize whitespace and remove common repeated characters
-        text = re.sub(r'[\r\n]{2,}', '\n', text)
-        text = re.sub(r'[ \t]{2,}', ' ', text)
-        text = re.sub(r'-{3,}', '---', text)
-        text = re.sub(r'\.{3,}', '...', text)
-
-        # 2. List of standard low-information bank boilerplate patterns to discard
-        boilerplate_patterns = [
-            r'(?i)If this transaction was not initiated by you.*',
-            r'(?i)To block (?:your|UPI|Card).*',
-            r'(?i)Call us at.*',
-            r'(?i)Always open to help you.*',
-            r'(?i)This is an auto-generated.*',
-            r'(?i)Kindly do not reply.*',
-            r'(?i)Download our app.*',
-            r'(?i)For details on the transaction.*',
-            r'(?i)Important notice:.*',
-            r'(?i)Register for.*',
-            r'(?i)Please note that.*',
-            r'(?i)You are eligible for.*',
-            r'(?i)Pre-approved (?:loan|card|limit).*',
-            r'(?i)Cashback offer.*',
-            r'(?i)Reward points.*',
-            r'(?i)Enjoy (?:benefits|discounts).*'
-        ]
-        
+        text = _MULTI_NEWLINE_RE.sub('\n', text)
+        text = _MULTI_SPACE_RE.sub(' ', text)
+        text = _DASH_RUN_RE.sub('---', text)
+        text = _DOT_RUN_RE.sub('...', text)
+
+        # 2. Drop boilerplate and 3. preserve lines that have "signal" tokens
+        # (see _BOILERPLATE_RE / _SIGNAL_RE at module level)
         lines = text.split('\n')
         compressed_lines = []
-        
-        # 3. Preserve lines that have "signal" tokens
-        signal_keywords = [
-            r'(?:Rs\.?|INR|₹)\s*[\d,]+', # Amount
-            r'UPI/(?:P2P|P2M)/',        # UPI Path
-            r'[a-zA-Z0-9.\-_]{2,}@[a-zA-Z]{2,}', # UPI ID
-            r'(?:Spent|Debited|Credited|Transferred|Paid)', # Verbs
-            r'\d{2}[-/]\d{2}[-/]\d{2,4}', # Dates
-            r'VPA|Merchant|Ref No|Txn ID|Order|Booking|Invoice|Billing|Reference|Thank you for' # Identifiers and human indicators
-        ]
-        signal_re = re.compile('|'.join(signal_keywords), re.IGNORECASE)
 
         for line in lines:
             line = line.strip()
@@ -144,73 +217,177 @@ class SyncService:
                 continue
                 
             # Skip if matches minor boilerplate within a line
-            is_boilerplate = any(re.search(p, line) for p in boilerplate_patterns)
-            if is_boilerplate and len(line) > 50:
+            if len(line) > 50 and _BOILERPLATE_RE.search(line):
                 continue
                 
             # Always keep short lines or lines with signal
-            if len(line) < 100 or signal_re.search(line):
+            if len(line) < 100 or _SIGNAL_RE.search(line):
                 compressed_lines.append(line)
 
         return '\n'.join(compressed_lines)
 
-    def _extract_email_body(self, payload: dict) -> str:
-        """Recursively extract text/plain or text/html body from message payload."""
-        mime_type = payload.get('mimeType', '')
-        
-        # Base cases
-        if mime_type == 'text/plain':
-            data = payload.get('body', {}).get('data')
+    def _find_part_data(self, node: dict, mime_type: str) -> Optional[str]:
+        """Depth-first search for the first `mime_type` part carrying inline body data."""
+        if node.get('mimeType') == mime_type:
+            data = node.get('body', {}).get('data')
             if data:
-                return base64.urlsafe_b64decode(data).decode()
-        elif mime_type == 'text/html':
-            data = payload.get('body', {}).get('data')
+                return data
+        for part in node.get('parts', ()):
+            data = self._find_part_data(part, mime_type)
             if data:
-                html_body = base64.urlsafe_b64decode(data).decode()
-                # Strip HTML tags
-                import html
-                text = re.sub(r'<[^>]+>', ' ', html_body)
-                return html.unescape(text)
-                
-        # Recursive cases for multiparts
-        parts = payload.get('parts', [])
-        # Prefer text/plain first
-        for part in parts:
-            if part.get('mimeType') == 'text/plain':
-                body = self._extract_email_body(part)
-                if body:
-                    return body
-                    
-        # Fallback to other parts (like nested multiparts or text/html)
-        for part in parts:
-            if part.get('mimeType') != 'text/plain':
-                body = self._extract_email_body(part)
-                if body:
-                    return body
-                    
-        # Check outer body for non-multipart emails
+                return data
+        return None
+
+    def _decode_body(self, data: str) -> str:
+        # Mis-declared charsets shouldn't abort the whole fetch
+        return base64.urlsafe_b64decode(data).decode('utf-8', errors='replace')
+
+    def _extract_email_body(self, payload: dict) -> str:
+        """Extract the text/plain body (preferred, at any nesting depth) or the tag-stripped text/html body."""
+        data = self._find_part_data(payload, 'text/plain')
+        if data:
+            return self._decode_body(data)
+
+        data = self._find_part_data(payload, 'text/html')
+        if data:
+            # Strip HTML tags
+            text = _HTML_TAG_RE.sub(' ', self._decode_body(data))
+            return html.unescape(text)
+
+        # Check outer body for non-multipart emails of other types
         data = payload.get('body', {}).get('data')
         if data:
-            return base64.urlsafe_b64decode(data).decode()
-            
+            return self._decode_body(data)
+
         return ""
 
+    def _extraction_cache_key(self, user_id: uuid.UUID, text: str, subject: str, sender: str, cat_str: str) -> str:
+        payload = "\x1f".join((str(user_id), subject or "", sender or "", cat_str, text))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _template_cache_key(self, user_id: uuid.UUID, text: str, subject: str, sender: str, cat_str: str) -> str:
+        skeleton = _NUMBER_RE.sub('#', f"{subject or ''}\x1f{text}".lower())
+        payload = "\x1f".join((str(user_id), sender or "", cat_str, skeleton))
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _cache_lookup(self, cache: dict, key: str):
+        entry = cache.get(key)
+        if not entry:
+            return None
+        ts, value = entry
+        if (time.time() - ts) >= self.EXTRACTION_CACHE_TTL:
+            cache.pop(key, None)
+            return None
+        return value
+
+    def _cache_store(self, cache: dict, key: str, value):
+        if len(cache) >= self.EXTRACTION_CACHE_MAX_SIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            cache.pop(next(iter(cache)))
+        cache[key] = (time.time(), value)
+
+    def _parse_template_date(self, value: str) -> Optional[date]:
+        try:
+            from dateutil import parser as dateparser
+            return dateparser.parse(value, dayfirst=True).date()
+        except Exception:
+            return None
+
+    def _template_slots(self, text: str, extracted: dict) -> Optional[tuple]:
+        """Find which amount / date occurrence in the email the extraction was read from."""
+        amount = abs(extracted["amount"])
+        amount_slot = None
+        for i, match in enumerate(_FALLBACK_AMOUNT_RE.finditer(text)):
+            try:
+                value = float(match.group(1).replace(',', ''))
+            except ValueError:
+                continue
+            if abs(value - amount) < 0.005:
+                amount_slot = i
+                break
+        if amount_slot is None:
+            return None
+
+        date_slot = None
+        extracted_date = self._parse_extracted_date(extracted.get("extracted_date"))
+        if extracted_date:
+            for i, match in enumerate(_TEMPLATE_DATE_RE.finditer(text)):
+                if self._parse_template_date(match.group(0)) == extracted_date:
+                    date_slot = i
+                    break
+            if date_slot is None:
+                return None
+        return amount_slot, date_slot
+
+    def _apply_template(self, text: str, extracted: dict, amount_slot: int, date_slot: Optional[int]) -> Optional[dict]:
+        """Overlay the live amount/date onto a cached template extraction; None if the slots don't line up."""
+        amounts = list(_FALLBACK_AMOUNT_RE.finditer(text))
+        if amount_slot >= len(amounts):
+            return None
+        try:
+            amount = float(amounts[amount_slot].group(1).replace(',', ''))
+        except ValueError:
+            return None
+        if amount <= 0:
+            return None
+
+        result = dict(extracted)
+        result["amount"] = amount
+        if date_slot is not None:
+            dates = list(_TEMPLATE_DATE_RE.finditer(text))
+            tx_date = self._parse_template_date(dates[date_slot].group(0)) if date_slot < len(dates) else None
+            if not tx_date:
+                return None
+            result["extracted_date"] = tx_date.isoformat()
+        return result
+
+    def _build_category_prompt(self, categories_context: Optional[List[str]]) -> str:
+        """Category section of the extraction prompt; constant for a sync, so render it once."""
+        # Compacting Category Context for token efficiency
+        if categories_context:
+            return "Available Categories and Sub-categories:\n" + "\n".join([f"- {c}" for c in categories_context]) #[:30]
+        return "Categories: Food, Transport, Shopping, Housing, Bills & Utilities, Investment, Income, Entertainment, Medical, Personal Care"
+
     async def call_brain_api(
         self,
         text: str,
         user_id: uuid.UUID,
         categories_context: List[str] = None,
         subject: str = "",
-        sender: str = ""
+        sender: str = "",
+        category_prompt: Optional[str] = None
     ) -> dict:
         """
         Unified LLM-based Transaction Identification & Extraction.
         Accuracy over Latency.
+        `category_prompt` (from _build_category_prompt) takes precedence over `categories_context`.
         """
-        # Compacting Category Context for token efficiency
-        cat_str = "Categories: Food, Transport, Shopping, Housing, Bills & Utilities, Investment, Income, Entertainment, Medical, Personal Care"
-        if categories_context:
-            cat_str = "Available Categories and Sub-categories:\n" + "\n".join([f"- {c}" for c in categories_context]) #[:30]
+        if not (_TXN_SIGNAL_RE.search(text) or _TXN_SIGNAL_RE.search(subject)):
+            logger.debug(f"[Brain:{user_id}] No transaction signal in email; skipping LLM.")
+            return self._regex_fallback_txn(text, user_id)
+
+        cat_str = category_prompt or self._build_category_prompt(categories_context)
+
+        # Same email, same category context -> same answer; skip the LLM entirely
+        cache_key = self._extraction_cache_key(user_id, text, subject, sender, cat_str)
+        cached = self._cache_lookup(SyncService._extraction_cache, cache_key)
+        if cached is not None:
+            logger.debug(f"[Brain:{user_id}] Extraction cache hit.")
+            return dict(cached)
+
+        # Same bank template with different digits -> reuse the extraction, re-reading amount/date
+        template_key = self._template_cache_key(user_id, text, subject, sender, cat_str)
+        template = self._cache_lookup(SyncService._template_cache, template_key)
+        if template is not None:
+            template_extracted, amount_slot, date_slot = template
+            if template_extracted is None:
+                # The LLM rejected this template before (OTP, promo, statement...)
+                logger.debug(f"[Brain:{user_id}] Template cache hit (non-transaction).")
+                return self._regex_fallback_txn(text, user_id)
+            applied = self._apply_template(text, template_extracted, amount_slot, date_slot)
+            if applied:
+                logger.debug(f"[Brain:{user_id}] Template cache hit.")
+                return applied
 
         # Reordering prompt for KV Cache optimization (Instructions at TOP)
         # Stage 0: Semantic Compression (LLMLingua-2 Concept)
@@ -261,62 +438,61 @@ class SyncService:
         BODY:
         \"\"\"{compressed_text[:6000]}\"\"\"
 
-        RETURN ONLY RAW JSON:
-        {{
-          "is_transaction": bool,
-          "amount": float,
-          "currency": "INR",
-          "merchant_name": string,
-          "category": string,
-          "sub_category": string,
-          "account_type": "SAVINGS" | "CREDIT_CARD",
-          "transaction_type": "DEBIT" | "CREDIT",
-          "extracted_date": "YYYY-MM-DD" | null
-        }}
+        RETURN ONLY THE JSON OBJECT.
         """
-         # Stage 1: Try Local LLM
-        data = await self.llm.generate_json(prompt, temperature=0.1)
+        # Stage 1: Try Local LLM. Output is decoded against the TxnExtraction schema, so the
+        # prompt doesn't need to spell out the JSON shape and fields arrive typed/defaulted.
+        data = await self.llm.generate_structured(TxnExtraction, prompt, temperature=0.1)
         
         # Retry with higher temperature if basic local extraction failed 
-        if not data or not data.get("is_transaction") or abs(data.get("amount", 0.0)) == 0:
+        if not data or not data.is_transaction or abs(data.amount) == 0:
             logger.warning(f"[Brain:{user_id}] Initial LLM extraction failed or returned 0 amount. Retrying with higher temp.")
-            retry_prompt = prompt + "\n\nCRITICAL: You MUST output valid JSON. Extract the transaction amount. Do not output 0 if a payment occurred."
-            data = await self.llm.generate_json(retry_prompt, temperature=0.4)
+            retry_prompt = prompt + "\n\nCRITICAL: Extract the transaction amount. Do not output 0 if a payment occurred."
+            data = await self.llm.generate_structured(TxnExtraction, retry_prompt, temperature=0.4)
 
         # Stage 2: Fallback to Groq if Local fails or returns non-transaction
         # if not data and self.llm.groq_api_key:
         #     logger.warning(f"[Brain:{user_id}] Local LLM failed. Falling back to Groq.")
-        #     data = await self.llm.generate_json(prompt, temperature=0.1)
-
-        if data and data.get("is_transaction"):
-            merchant = (data.get("merchant_name") or data.get("merchant") or "UNKNOWN").strip()
-            if abs(data.get("amount", 0.0)) > 0:
-                logger.info(f"[Brain:{user_id}] Extracted: ₹{data.get('amount')} | Merchant: {merchant}")
-                # Ensure required fields exist even if LLM missed them
-                return {
-                    "amount": float(data.get("amount") or 0.0),
-                    "currency": data.get("currency") or "INR",
+        #     data = await self.llm.generate_structured(TxnExtraction, prompt, temperature=0.1)
+
+        if data and data.is_transaction:
+            merchant = data.merchant_name.strip()
+            if abs(data.amount) > 0:
+                logger.info(f"[Brain:{user_id}] Extracted: ₹{data.amount} | Merchant: {merchant}")
+                extracted = {
+                    "amount": data.amount,
+                    "currency": data.currency,
                     "merchant_name": merchant.title(),
-                    "category": data.get("category") or "Uncategorized",
-                    "sub_category": data.get("sub_category") or "Uncategorized",
-                    "account_type": data.get("account_type") or "SAVINGS",
-                    "transaction_type": data.get("transaction_type") or "DEBIT",
-                    "extracted_date": data.get("extracted_date"),
+                    "category": data.category,
+                    "sub_category": data.sub_category,
+                    "account_type": data.account_type,
+                    "transaction_type": data.transaction_type,
+                    "extracted_date": data.extracted_date,
                     "extractor": "🤖 L"
                 }
+                self._cache_store(SyncService._extraction_cache, cache_key, dict(extracted))
+                slots = self._template_slots(text, extracted)
+                if slots:
+                    self._cache_store(SyncService._template_cache, template_key, (dict(extracted), *slots))
+                return extracted
 
         # Stage 3: Regex Fallback Network 
         # If LLM completely failed, at least try to salvage the amount and merchant UPI
-        return self._regex_fallback_txn(text, user_id)
+        extracted = self._regex_fallback_txn(text, user_id)
+        if data:
+            # The LLM did answer (e.g. not a transaction); only transient failures are retried next sync
+            self._cache_store(SyncService._extraction_cache, cache_key, dict(extracted))
+            if not data.is_transaction:
+                self._cache_store(SyncService._template_cache, template_key, (None, None, None))
+        return extracted
 
     def _regex_fallback_txn(self, text: str, user_id: uuid.UUID) -> dict:
-        import re
         amount = 0.0
         merchant = "UNKNOWN"
         txn_type = "DEBIT" # Most notifications are debits
         
         # 1. Search for amount
-        amount_match = re.search(r'(?:Rs\.?|INR|₹)\s*([\d,]+\.?\d*)', text, re.IGNORECASE)
+        amount_match = _FALLBACK_AMOUNT_RE.search(text)
         if amount_match:
             try:
                 base_val = amount_match.group(1).replace(',', '')
@@ -326,24 +502,21 @@ class SyncService:
 
         if amount > 0:
              # Basic keyword checking for credit
-             if re.search(r'\b(?:credited|received|deposit)\b', text, re.IGNORECASE):
+             if _FALLBACK_CREDIT_RE.search(text):
                  txn_type = "CREDIT"
              
              # 2. Search for UPI patterns for the merchant
-             # Format A: Business/UPI ID (user@bank)
-             upi_id_match = re.search(r'\b([a-zA-Z0-9.\-_]{2,}@[a-zA-Z]{2,})\b', text)
-             
-             # Format B: UPI Transaction Path (UPI/P2P/something/Merchant/...)
-             upi_path_match = re.search(r'UPI/(?:P2P|P2M)/[^/\r\n]+/([^/\r\n]+?)(?:/|\r|\n|$)', text, re.IGNORECASE)
-             
-             # Format C: General "by/at/to/towards/from" patterns
-             # Find all occurrences to handle cases where "by" or "to" appears multiple times
-             all_general = re.findall(r'\b(?:at|by|to|towards|from)\s+([A-Z0-9\s.\-]{3,100})(?:\s+on|\s+at|\s+using|\s+for|\.|\r|\n|$)', text, re.IGNORECASE)
+             # Format B: UPI Transaction Path (UPI/P2P/something/Merchant/...) takes priority,
+             # so the UPI ID scan only runs when no path was found
+             upi_path_match = _FALLBACK_UPI_PATH_RE.search(text)
 
              if upi_path_match:
                  merchant = upi_path_match.group(1).strip().title()
-             elif upi_id_match:
-                 merchant = upi_id_match.group(1).title()
+             else:
+                 # Format A: Business/UPI ID (user@bank)
+                 upi_id_match = _FALLBACK_UPI_ID_RE.search(text)
+                 if upi_id_match:
+                     merchant = upi_id_match.group(1).title()
                  
              logger.info(f"[Brain:{user_id}] Regex Fallback Extracted: ₹{amount} | Merchant: {merchant} | Type: {txn_type}")
 
@@ -358,6 +531,20 @@ class SyncService:
             "extractor": "🔍 R"
         }
 
+    def _parse_extracted_date(self, value) -> Optional[date]:
+        """Parse the LLM's extracted_date; ISO (the requested format) avoids dateutil entirely."""
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value[:10])
+        except (TypeError, ValueError):
+            pass
+        try:
+            from dateutil import parser as dateparser
+            return dateparser.parse(value).date()
+        except Exception:
+            return None
+
     def _fallback_txn(self) -> dict:
         return {
             "amount": 0.0,
@@ -369,10 +556,121 @@ class SyncService:
             "transaction_type": "DEBIT"
         }
 
+    def _get_cached_gmail_service(self, user_id: uuid.UUID, stored_token: Optional[str]) -> Optional[tuple]:
+        """Reuse the Credentials + discovery-built Gmail client while the stored token is unchanged and valid."""
+        entry = SyncService._gmail_service_cache.get(user_id)
+        if not entry:
+            return None
+        ts, token, creds, service = entry
+        if (time.time() - ts) >= self.GMAIL_SERVICE_CACHE_TTL or token != stored_token or not creds.valid:
+            SyncService._gmail_service_cache.pop(user_id, None)
+            return None
+        return creds, service
+
+    def _set_cached_gmail_service(self, user_id: uuid.UUID, creds: Credentials, service):
+        SyncService._gmail_service_cache.pop(user_id, None)
+        if len(SyncService._gmail_service_cache) >= self.GMAIL_SERVICE_CACHE_MAX_SIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            SyncService._gmail_service_cache.pop(next(iter(SyncService._gmail_service_cache)))
+        SyncService._gmail_service_cache[user_id] = (time.time(), creds.token, creds, service)
+
+    @staticmethod
+    def _creds_to_dict(creds: Credentials) -> dict:
+        """Shape stored in User.gmail_credentials."""
+        return {
+            "token": creds.token,
+            "refresh_token": creds.refresh_token,
+            "expiry": creds.expiry.isoformat() if creds.expiry else None
+        }
+
+    async def _build_gmail_service(self, user_id: uuid.UUID, user: User, creds_data: dict) -> tuple:
+        # Parse stored expiry so Credentials knows when the token expires
+        expiry = None
+        expiry_raw = creds_data.get('expiry')
+        if expiry_raw:
+            try:
+                expiry = datetime.fromisoformat(expiry_raw)
+            except (ValueError, TypeError):
+                logger.warning(f"[Sync:{user_id}] Could not parse stored token expiry, will rely on 401 auto-refresh.")
+
+        has_refresh = bool(creds_data.get('refresh_token'))
+        logger.info(f"[Sync:{user_id}] Building credentials. has_refresh_token={has_refresh}, has_expiry={expiry is not None}")
+
+        creds = Credentials(
+            token=creds_data.get('token'),
+            refresh_token=creds_data.get('refresh_token'),
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=settings.GOOGLE_CLIENT_ID,
+            client_secret=settings.GOOGLE_CLIENT_SECRET,
+            scopes=["https://www.googleapis.com/auth/gmail.readonly"],
+            expiry=expiry
+        )
+
+        # Proactive refresh if token is expired or about to expire
+        if creds.expired and creds.refresh_token:
+            logger.info(f"[Sync:{user_id}] Token expired, attempting proactive refresh.")
+            try:
+                await asyncio.to_thread(creds.refresh, GoogleRequest())
+                user.gmail_credentials = self._creds_to_dict(creds)
+                await self.db.commit()
+                logger.info(f"[Sync:{user_id}] Token refreshed and saved successfully.")
+            except Exception as refresh_ex:
+                logger.error(f"[Sync:{user_id}] Token refresh FAILED: {type(refresh_ex).__name__}: {refresh_ex}")
+                user.gmail_credentials = None
+                await self.db.commit()
+                raise Exception("GMAIL_DISCONNECTED")
+        elif not creds.refresh_token:
+            logger.warning(f"[Sync:{user_id}] No refresh_token available. If access token is stale, sync will fail.")
+
+        # Discovery-document parsing is CPU/IO heavy; keep it off the event loop
+        service = await asyncio.to_thread(build, 'gmail', 'v1', credentials=creds)
+        return creds, service
+
+    def _content_hash(self, msg_id: str, internal_date: str) -> str:
+        """Dedup key stored as Transaction.raw_content_hash."""
+        return hashlib.sha256(f"{msg_id}:{internal_date}".encode()).hexdigest()
+
+    def _is_known_hash(self, content_hash: str) -> bool:
+        ts = SyncService._known_hash_cache.get(content_hash)
+        if ts is None:
+            return False
+        if (time.time() - ts) >= self.KNOWN_HASH_CACHE_TTL:
+            SyncService._known_hash_cache.pop(content_hash, None)
+            return False
+        return True
+
+    def _remember_hashes(self, content_hashes):
+        now = time.time()
+        for content_hash in content_hashes:
+            if len(SyncService._known_hash_cache) >= self.KNOWN_HASH_CACHE_MAX_SIZE:
+                SyncService._known_hash_cache.pop(next(iter(SyncService._known_hash_cache)))
+            SyncService._known_hash_cache[content_hash] = now
+
+    async def _batch_get_messages(self, service, msg_ids: List[str], **params) -> dict:
+        """messages.get for many ids in one multiplexed batch request (Gmail allows up to 100 sub-requests)."""
+        if not msg_ids:
+            return {}
+        fetched = {}
+        fetch_errors = []
+
+        def _on_message(request_id, response, exception):
+            if exception is not None:
+                fetch_errors.append(exception)
+            else:
+                fetched[request_id] = response
+
+        batch = service.new_batch_http_request(callback=_on_message)
+        for msg_id in msg_ids:
+            batch.add(service.users().messages().get(userId='me', id=msg_id, **params), request_id=msg_id)
+        await asyncio.to_thread(batch.execute)
+        if fetch_errors:
+            # Same contract as a per-message fetch: any failed message fails the fetch
+            raise fetch_errors[0]
+        return fetched
+
     async def fetch_gmail_changes(self, user_id: uuid.UUID, start_time: datetime = None) -> List[dict]:
         """Fetch banking emails from Gmail."""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await self.db.get(User, user_id)
         
         if not user or not user.gmail_credentials:
             logger.warning(f"[Sync:{user_id}] No user or no gmail_credentials found. Aborting fetch.")
@@ -380,50 +678,14 @@ class SyncService:
 
         try:
             creds_data = user.gmail_credentials
-            
-            # Parse stored expiry so Credentials knows when the token expires
-            expiry = None
-            expiry_raw = creds_data.get('expiry')
-            if expiry_raw:
-                try:
-                    expiry = datetime.fromisoformat(expiry_raw)
-                except (ValueError, TypeError):
-                    logger.warning(f"[Sync:{user_id}] Could not parse stored token expiry, will rely on 401 auto-refresh.")
-
-            has_refresh = bool(creds_data.get('refresh_token'))
-            logger.info(f"[Sync:{user_id}] Building credentials. has_refresh_token={has_refresh}, has_expiry={expiry is not None}")
-
-            creds = Credentials(
-                token=creds_data.get('token'),
-                refresh_token=creds_data.get('refresh_token'),
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=settings.GOOGLE_CLIENT_ID,
-                client_secret=settings.GOOGLE_CLIENT_SECRET,
-                scopes=["https://www.googleapis.com/auth/gmail.readonly"],
-                expiry=expiry
-            )
 
-            # Proactive refresh if token is expired or about to expire
-            if creds.expired and creds.refresh_token:
-                logger.info(f"[Sync:{user_id}] Token expired, attempting proactive refresh.")
-                try:
-                    creds.refresh(GoogleRequest())
-                    user.gmail_credentials = {
-                        "token": creds.token,
-                        "refresh_token": creds.refresh_token,
-                        "expiry": creds.expiry.isoformat() if creds.expiry else None
-                    }
-                    await self.db.commit()
-                    logger.info(f"[Sync:{user_id}] Token refreshed and saved successfully.")
-                except Exception as refresh_ex:
-                    logger.error(f"[Sync:{user_id}] Token refresh FAILED: {type(refresh_ex).__name__}: {refresh_ex}")
-                    user.gmail_credentials = None
-                    await self.db.commit()
-                    raise Exception("GMAIL_DISCONNECTED")
-            elif not creds.refresh_token:
-                logger.warning(f"[Sync:{user_id}] No refresh_token available. If access token is stale, sync will fail.")
-
-            service = build('gmail', 'v1', credentials=creds)
+            cached = self._get_cached_gmail_service(user_id, creds_data.get('token'))
+            if cached:
+                creds, service = cached
+                logger.info(f"[Sync:{user_id}] Reusing cached Gmail client.")
+            else:
+                creds, service = await self._build_gmail_service(user_id, user, creds_data)
+
             # Specific keywords to catch transactions without pulling in too much noise
             query = "debit OR debited OR credit OR alert OR spent"
             if start_time:
@@ -431,51 +693,82 @@ class SyncService:
             
             logger.info(f"[Sync:{user_id}] Gmail query: after={start_time.isoformat() if start_time else 'None'}")
             
-            results = service.users().messages().list(userId='me', q=query, maxResults=50, includeSpamTrash=True).execute()
+            list_request = service.users().messages().list(userId='me', q=query, maxResults=50, includeSpamTrash=True)
+            results = await asyncio.to_thread(list_request.execute)
             messages = results.get('messages', [])
             
             logger.info(f"[Sync:{user_id}] Gmail returned {len(messages)} message(s) matching query.")
 
-            # After API call, persist any auto-refreshed token back to DB
-            if creds.token != creds_data.get('token'):
+            # After API call, persist any auto-refreshed token back to DB. Compared against the
+            # stored value, not the creds_data snapshot, so a proactive refresh that was already
+            # saved doesn't trigger a second UPDATE + commit
+            if creds.token != (user.gmail_credentials or {}).get('token'):
                 logger.info(f"[Sync:{user_id}] Token was auto-refreshed during API call. Saving new token.")
-                user.gmail_credentials = {
-                    "token": creds.token,
-                    "refresh_token": creds.refresh_token,
-                    "expiry": creds.expiry.isoformat() if creds.expiry else None
-                }
+                user.gmail_credentials = self._creds_to_dict(creds)
                 await self.db.commit()
 
+            # Pass 1: headers, snippet and internalDate only (one multiplexed batch request),
+            # enough to dedup against stored transactions before pulling any bodies
+            metadata = await self._batch_get_messages(
+                service, [m['id'] for m in messages], format='metadata', metadataHeaders=['Subject', 'From'],
+                fields='id,internalDate,snippet,payload/headers'
+            )
+            hashes = {
+                msg_id: self._content_hash(msg_id, meta['internalDate'])
+                for msg_id, meta in metadata.items()
+            }
+            existing_hashes = {h for h in hashes.values() if self._is_known_hash(h)}
+            unknown_hashes = [h for h in hashes.values() if h not in existing_hashes]
+            if unknown_hashes:
+                stored = await self.txn_service.get_existing_hashes(unknown_hashes)
+                self._remember_hashes(stored)
+                existing_hashes |= stored
+
+            # Pass 2: full payloads, only for messages not imported yet
+            new_ids = [m['id'] for m in messages if hashes[m['id']] not in existing_hashes]
+            # Partial response: only the MIME tree the body extractor walks, not the
+            # full header block (Received/DKIM/ARC chains) already covered by pass 1
+            fetched = await self._batch_get_messages(service, new_ids, fields='payload(mimeType,body/data,parts)')
+
+            self._set_cached_gmail_service(user_id, creds, service)
+
             detailed_messages = []
             body_extract_failures = 0
             for msg_meta in messages:
-                msg = service.users().messages().get(userId='me', id=msg_meta['id']).execute()
-                
-                body = self._extract_email_body(msg.get('payload', {}))
+                meta = metadata[msg_meta['id']]
+                content_hash = hashes[msg_meta['id']]
+                duplicate = content_hash in existing_hashes
 
-                if not body:
-                    body_extract_failures += 1
+                body = None
+                if not duplicate:
+                    body = self._extract_email_body(fetched[msg_meta['id']].get('payload', {}))
+                    if not body:
+                        body_extract_failures += 1
 
                 # Extract Subject and From headers
-                headers = msg.get('payload', {}).get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), "No Subject")
-                sender = next((h['value'] for h in headers if h['name'] == 'From'), "")
+                # Reversed so a repeated header keeps its first value
+                headers = {h['name']: h['value'] for h in reversed(meta.get('payload', {}).get('headers', []))}
+                subject = headers.get('Subject', "No Subject")
+                sender = headers.get('From', "")
 
                 detailed_messages.append({
-                    "id": msg['id'],
-                    "internalDate": msg['internalDate'],
-                    "snippet": msg['snippet'],
+                    "id": meta['id'],
+                    "internalDate": meta['internalDate'],
+                    "snippet": meta['snippet'],
                     "subject": subject,
                     "sender": sender,
-                    "body": body
+                    "body": body,
+                    "content_hash": content_hash,
+                    "duplicate": duplicate
                 })
             
             if body_extract_failures > 0:
-                logger.warning(f"[Sync:{user_id}] Could not extract body from {body_extract_failures}/{len(messages)} message(s). Will fall back to snippet.")
+                logger.warning(f"[Sync:{user_id}] Could not extract body from {body_extract_failures}/{len(new_ids)} new message(s). Will fall back to snippet.")
             
             return detailed_messages
 
         except Exception as e:
+            SyncService._gmail_service_cache.pop(user_id, None)
             error_type = type(e).__name__
             logger.error(f"[Sync:{user_id}] Gmail fetch FAILED: {error_type}: {e}")
             # Propagate credential failures so they're visible in sync history
@@ -491,8 +784,7 @@ class SyncService:
         if not settings.GMAIL_PUBSUB_TOPIC:
             return
 
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        user = await self.db.get(User, user_id)
         if not user:
             logger.warning(f"[Sync:{user_id}] User not found for watch renewal.")
             return
@@ -503,25 +795,29 @@ class SyncService:
 
         try:
             creds_data = user.gmail_credentials
-            creds = Credentials(
-                token=creds_data.get('token'),
-                refresh_token=creds_data.get('refresh_token'),
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=settings.GOOGLE_CLIENT_ID,
-                client_secret=settings.GOOGLE_CLIENT_SECRET,
-                scopes=["https://www.googleapis.com/auth/gmail.readonly"]
-            )
-            
-            # Refresh if needed
-            if creds.expired and creds.refresh_token:
-                creds.refresh(GoogleRequest())
-            
-            service = build('gmail', 'v1', credentials=creds)
+            cached = self._get_cached_gmail_service(user_id, creds_data.get('token'))
+            if cached:
+                creds, service = cached
+            else:
+                creds = Credentials(
+                    token=creds_data.get('token'),
+                    refresh_token=creds_data.get('refresh_token'),
+                    token_uri="https://oauth2.googleapis.com/token",
+                    client_id=settings.GOOGLE_CLIENT_ID,
+                    client_secret=settings.GOOGLE_CLIENT_SECRET,
+                    scopes=["https://www.googleapis.com/auth/gmail.readonly"]
+                )
+
+                # Refresh if needed
+                if creds.expired and creds.refresh_token:
+                    await asyncio.to_thread(creds.refresh, GoogleRequest())
+
+                service = await asyncio.to_thread(build, 'gmail', 'v1', credentials=creds)
             
             # CRITICAL FIX: Gmail only allows one watch per (user, app). 
             # If we changed topics or have a stale watch, we must stop it first.
             try:
-                service.users().stop(userId='me').execute()
+                await asyncio.to_thread(service.users().stop(userId='me').execute)
                 logger.debug(f"[Sync:{user_id}] Stopped existing Gmail watch to prepare for renewal.")
             except Exception as stop_ex:
                 # If there was no watch, this might fail, which is fine.
@@ -531,15 +827,11 @@ class SyncService:
                 'labelIds': ['INBOX'],
                 'topicName': settings.GMAIL_PUBSUB_TOPIC
             }
-            watch_response = service.users().watch(userId='me', body=watch_request).execute()
+            watch_response = await asyncio.to_thread(service.users().watch(userId='me', body=watch_request).execute)
             
             # Persist refreshed token if it changed
-            if creds.token != creds_data.get('token'):
-                user.gmail_credentials = {
-                    "token": creds.token,
-                    "refresh_token": creds.refresh_token,
-                    "expiry": creds.expiry.isoformat() if creds.expiry else None
-                }
+            if creds.token != (user.gmail_credentials or {}).get('token'):
+                user.gmail_credentials = self._creds_to_dict(creds)
                 await self.db.commit()
                 
         except Exception as e:
@@ -553,48 +845,62 @@ class SyncService:
             if (now - ts) < self.TRENDS_CACHE_TTL:
                 return data
 
-        from sqlalchemy import func, cast, Date
+        from sqlalchemy import func
         from app.features.transactions.models import Transaction
         
-        # Query transaction counts grouped by date and is_manual
+        # One row per date with manual/system counts pivoted in SQL (aggregate FILTER clauses)
+        manual_count = func.count(Transaction.id).filter(Transaction.is_manual.is_(True))
+        system_count = func.count(Transaction.id).filter(Transaction.is_manual.isnot(True))  # Automated (Sync)
         stmt = (
             select(
                 Transaction.transaction_date.label("date"),
-                Transaction.is_manual,
-                func.count(Transaction.id).label("count")
+                manual_count.label("manual"),
+                system_count.label("system")
             )
             .where(Transaction.user_id == user_id)
             .where(Transaction.transaction_date.isnot(None))
-            .group_by(Transaction.transaction_date, Transaction.is_manual)
+            .group_by(Transaction.transaction_date)
             .order_by(Transaction.transaction_date.desc())
-            .limit(days * 2)
+            .limit(days)
         )
         
         result = await self.db.execute(stmt)
         rows = result.all()
         
-        trends_map = {}
-        for row in rows:
-            if not row.date:
-                continue
-            date_str = row.date.isoformat()
-            if date_str not in trends_map:
-                trends_map[date_str] = {"date": date_str, "manual": 0, "system": 0}
-            
-            val = int(row.count or 0)
-            if row.is_manual:
-                trends_map[date_str]["manual"] += val
-            else:
-                # Automated (Sync)
-                trends_map[date_str]["system"] += val
-        
-        sorted_trends = sorted(trends_map.values(), key=lambda x: x["date"])
+        # Newest-first from the query; the chart wants oldest-first
+        sorted_trends = [
+            {"date": row.date.isoformat(), "manual": row.manual, "system": row.system}
+            for row in reversed(rows)
+        ]
         
         # Cache the result
         SyncService._trends_cache[user_id] = (now, sorted_trends)
         
         return sorted_trends
 
+    async def _extract_message(self, msg: dict, user_id: uuid.UUID, category_prompt: str, sem: asyncio.Semaphore) -> dict:
+        async with sem:
+            # Sanitize and send to extraction pipeline
+            raw_body = msg['body'] or msg['snippet']
+            clean_text = self.sanitizer.sanitize(raw_body)
+
+            t_brain_start = time.perf_counter()
+            try:
+                extracted = await self.call_brain_api(
+                    text=clean_text,
+                    user_id=user_id,
+                    category_prompt=category_prompt,
+                    subject=msg.get('subject', ''),
+                    sender=msg.get('sender', '')
+                )
+            except Exception as e:
+                # Runs inside gather(): one bad email must not abort the rest of the batch
+                logger.error(f"[Sync:{user_id}] Extraction failed for {msg['id']}: {type(e).__name__}: {e}")
+                extracted = self._regex_fallback_txn(clean_text, user_id)
+            t_brain = (time.perf_counter() - t_brain_start) * 1000
+            logger.debug(f"[Sync:{user_id}] Brain extraction for {msg['id']} took {t_brain:.2f}ms")
+            return extracted
+
     async def execute_sync(self, user_id: uuid.UUID, source: str):
         # 0. Concurrency & Debounce Guard: 
         # Skip if another sync is already debouncing or running for this user
@@ -611,6 +917,11 @@ class SyncService:
                 logger.info(f"[Sync:{user_id}] Webhook triggered. Debouncing for {delay}s...")
                 await asyncio.sleep(delay)
 
+            # _active_syncs only covers this process; another worker may already be syncing
+            if await self._has_running_sync(user_id):
+                logger.info(f"[Sync:{user_id}] A sync is already RUNNING in another worker. Skipping redundant {source} trigger.")
+                return
+
             log = await self._log_start(user_id, source)
             try:
                 start_time = await self._get_last_sync_time(user_id)
@@ -648,33 +959,36 @@ class SyncService:
                 zero_amount_skipped = 0
                 sync_summary = []
 
-                for msg in messages:
-                    dedup_payload = f"{msg['id']}:{msg['internalDate']}"
-                    content_hash = hashlib.sha256(dedup_payload.encode()).hexdigest()
-                    
-                    if await self.txn_service.get_transaction_by_hash(content_hash):
-                        dedup_skipped += 1
-                        continue
-                    
-                    # Sanitize and send to extraction pipeline
-                    raw_body = msg['body'] or msg['snippet']
-                    clean_text = self.sanitizer.sanitize(raw_body)
-                    
-                    t_brain_start = time.perf_counter()
-                    extracted = await self.call_brain_api(
-                        text=clean_text,
-                        user_id=user_id,
-                        categories_context=cat_list,
-                        subject=msg.get('subject', ''),
-                        sender=msg.get('sender', '')
-                    )
-                    t_brain = (time.perf_counter() - t_brain_start) * 1000
-                    logger.debug(f"[Sync:{user_id}] Brain extraction for {msg['id']} took {t_brain:.2f}ms")
-                    
+                # Already-imported messages were flagged (and their bodies skipped) during fetch
+                pending = [(msg, msg['content_hash']) for msg in messages if not msg['duplicate']]
+                dedup_skipped = len(messages) - len(pending)
+
+                # Extraction touches no DB state, so run it concurrently; everything that uses
+                # the shared session below stays sequential and in Gmail order
+                # Render the category section once; every email's prompt then shares the same
+                # instructions + categories prefix, which llama-cpp reuses from its KV cache
+                category_prompt = self._build_category_prompt(cat_list)
+                sem = asyncio.Semaphore(settings.SYNC_EXTRACTION_CONCURRENCY)
+                extractions = await asyncio.gather(*[
+                    self._extract_message(msg, user_id, category_prompt, sem) for msg, _ in pending
+                ])
+
+                # Prefetch merchant mappings and surety flags for the whole batch instead of
+                # two queries per message
+                mappings = await self.txn_service.get_merchant_mappings(
+                    [extracted["merchant_name"] for extracted in extractions if abs(extracted["amount"]) > 0]
+                )
+                surety_by_sub = {}
+                for c in db_categories:
+                    for sub_cat in c.sub_categories:
+                        surety_by_sub.setdefault(sub_cat.name, sub_cat.is_surety)
+
+                rows_to_insert = []
+                for (msg, content_hash), extracted in zip(pending, extractions):
                     # Skip if no valid amount was extracted (LLM timeout/failure or non-transaction email)
                     if abs(extracted["amount"]) == 0:
                         merchant = extracted.get("merchant_name", "UNKNOWN")
-                        if merchant == "UNCATEGORIZED" or merchant == "UNKNOWN":
+                        if merchant in _PLACEHOLDER_MERCHANTS:
                             llm_failed += 1
                             logger.warning(f"[Sync:{user_id}] LLM failed for '{msg['subject']}' ({msg['id']}). Snippet: {msg['snippet'][:50]}...")
                         else:
@@ -682,7 +996,7 @@ class SyncService:
                             logger.info(f"[Sync:{user_id}] ₹0 found for '{merchant}' in '{msg['subject']}'. Skipping.")
                         continue
 
-                    mapping = await self.txn_service.get_merchant_mapping(extracted["merchant_name"])
+                    mapping = mappings.get(extracted["merchant_name"].strip().lower())
                     cat, sub = extracted["category"], extracted["sub_category"]
                     
                     # Use mapping if available overrides
@@ -699,21 +1013,13 @@ class SyncService:
                     else:
                         final_amount = -final_amount
 
-                    # Fetch surety status
-                    stmt = select(SubCategory.is_surety).where(SubCategory.name == sub).limit(1)
-                    res = await self.db.execute(stmt)
-                    is_surety_flag = res.scalar() or False
+                    # Surety status from the prefetched sub-categories
+                    is_surety_flag = surety_by_sub.get(sub) or False
 
                     # Use date extracted from email body; fall back to Gmail delivery date
-                    tx_date = None
-                    if extracted.get("extracted_date"):
-                        try:
-                            from dateutil import parser as dateparser
-                            tx_date = dateparser.parse(extracted["extracted_date"]).date()
-                        except Exception:
-                            pass
+                    tx_date = self._parse_extracted_date(extracted.get("extracted_date"))
                     if not tx_date:
-                        tx_date = datetime.fromtimestamp(int(msg['internalDate']) / 1000).date()
+                        tx_date = date.fromtimestamp(int(msg['internalDate']) // 1000)
 
                     # Append sanitized subject to remarks for better manual review
                     clean_subject = self.sanitizer.sanitize(msg.get('subject', ''))
@@ -721,7 +1027,7 @@ class SyncService:
                     prefix = f"{ext_icon} | " if ext_icon else ""
                     improved_remarks = f"{prefix}Synced via {source} | Subject: {clean_subject}"
 
-                    new_txn = await self.txn_service.create_transaction({
+                    rows_to_insert.append({
                         "id": uuid.uuid4(),
                         "user_id": user_id,
                         "raw_content_hash": content_hash,
@@ -736,19 +1042,26 @@ class SyncService:
                         "remarks": improved_remarks,
                         "is_surety": is_surety_flag
                     })
-                    
-                    # Attempt to map to Wealth/Investment (INTEGRATED)
+
+                # Insert the whole batch with one flush; transactions, wealth updates and the
+                # sync log are committed together by _log_end
+                new_txns = await self.txn_service.create_transactions(rows_to_insert, commit=False)
+
+                for new_txn in new_txns:
+                    # Attempt to map to Wealth/Investment (INTEGRATED); a savepoint keeps a failed
+                    # mapping from poisoning the batch transaction
                     wealth_mapped = False
                     try:
-                        wealth_mapped = await self.wealth_service.process_transaction_match(new_txn)
+                        async with self.db.begin_nested():
+                            wealth_mapped = await self.wealth_service.process_transaction_match(new_txn, commit=False)
                     except Exception as w_ex:
                         logger.error(f"[Sync:{user_id}] Wealth mapping failed for txn {new_txn.id}: {type(w_ex).__name__}")
 
                     sync_summary.append({
-                        "id": str(new_txn.id),
-                        "merchant": extracted["merchant_name"],
-                        "amount": final_amount,
-                        "category": cat,
+                        "id": new_txn.id,
+                        "merchant": new_txn.merchant_name,
+                        "amount": new_txn.amount,
+                        "category": new_txn.category,
                         "wealth_mapped": wealth_mapped
                     })
 
@@ -761,14 +1074,16 @@ class SyncService:
                     f"processed={processed_count}"
                 )
                 await self._log_end(log, "SUCCESS", processed_count, summary=sync_summary)
+                self._remember_hashes(row["raw_content_hash"] for row in rows_to_insert)
                 
             except Exception as e:
                 error_type = type(e).__name__
                 logger.error(f"[Sync:{user_id}] Sync process FAILED: {error_type}: {e}")
+                # Discard any half-written batch so the FAILED log doesn't commit it
+                await self.db.rollback()
                 if str(e) == "GMAIL_DISCONNECTED":
                     # Fetch user for notification
-                    result = await self.db.execute(select(User).where(User.id == user_id))
-                    user = result.scalar_one_or_none()
+                    user = await self.db.get(User, user_id)
                     if user and user.email:
                         await self.notification_service.notify_gmail_disconnection(user_id, user.email, user.full_name or "Grip User")
                     await self._log_end(log, "FAILED", 0, "Gmail connection lost. Please reconnect.")
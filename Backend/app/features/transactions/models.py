@@ -2,7 +2,7 @@ import uuid
 from decimal import Decimal
 from datetime import date
 from typing import List, Optional
-from sqlalchemy import String, ForeignKey, Numeric, ARRAY, Text, DateTime, Boolean, Date, Index
+from sqlalchemy import String, ForeignKey, Numeric, ARRAY, Text, DateTime, Boolean, Date, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -23,6 +23,13 @@ class Transaction(Base):
     __tablename__ = "transactions"
     __table_args__ = (
         Index("ix_transactions_user_date", "user_id", "transaction_date"),
+        # Expense-history aggregations (dashboard/forecasting): partial on the constant
+        # non-Income predicate, with amount carried in the leaf so SUMs can be index-only
+        Index(
+            "ix_transactions_user_date_cat_expense", "user_id", "transaction_date", "category",
+            postgresql_where=text("category != 'Income'"),
+            postgresql_include=["amount"]
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
@@ -2,7 +2,7 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, date
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Literal
 
 # Core status constants for validation
@@ -20,9 +20,7 @@ class TransactionBase(BaseModel):
     remarks: Optional[str] = None
     tags: Optional[List[str]] = []
 
-    class Config:
-        str_strip_whitespace = True
-        populate_by_name = True
+    model_config = ConfigDict(str_strip_whitespace=True, populate_by_name=True)
 
 class TransactionCreate(TransactionBase):
     raw_content_hash: str
@@ -42,8 +40,7 @@ class ManualTransactionCreate(BaseModel):
     remarks: Optional[str] = None
     tags: Optional[List[str]] = []
 
-    class Config:
-        str_strip_whitespace = True
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class TransactionUpdate(BaseModel):
     # Used for verification/updates
@@ -54,9 +51,7 @@ class TransactionUpdate(BaseModel):
     remarks: Optional[str] = None
     tags: Optional[List[str]] = []
 
-    class Config:
-        str_strip_whitespace = True
-        populate_by_name = True
+    model_config = ConfigDict(str_strip_whitespace=True, populate_by_name=True)
 
 class TransactionResponse(TransactionBase):
     id: UUID
@@ -75,8 +70,7 @@ class TransactionResponse(TransactionBase):
     category_color: Optional[str] = None
     sub_category_color: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class VerificationRequest(BaseModel):
     category: str
@@ -87,8 +81,7 @@ class VerificationRequest(BaseModel):
     tags: Optional[List[str]] = []
     remarks: Optional[str] = None
 
-    class Config:
-        str_strip_whitespace = True
+    model_config = ConfigDict(str_strip_whitespace=True)
 
 class CategoriesResponse(BaseModel):
     categories: dict[str, list[str]]
@@ -16,6 +16,9 @@ from decimal import Decimal
 import logging
 logger = logging.getLogger(__name__)
 
+# Merchant names that never carry a user mapping
+PLACEHOLDER_MERCHANTS = frozenset({"UNKNOWN", "UNCATEGORIZED", "NULL", "UNKNOWN MERCHANT"})
+
 # Categories that trigger auto-shadowing to the Settle Up ledger
 # Sub-categories that trigger auto-shadowing to the Settle Up ledger
 # These must match the exact sub_category names stored in the DB
@@ -32,13 +35,8 @@ class TransactionService:
             
         from app.features.categories.service import CategoryService
         cat_service = CategoryService(self.db)
-        categories = await cat_service.get_cached_categories(user_id)
-        
-        for cat in categories:
-            for sub in cat.sub_categories:
-                if sub.name.lower() == sub_category_name.lower():
-                    return sub.is_surety
-        return False
+        surety_map = await cat_service.get_cached_surety_map(user_id)
+        return bool(surety_map.get(sub_category_name.lower(), False))
 
     async def _attach_icons(self, transactions: List[Transaction]) -> List[Transaction]:
         from app.features.categories.models import Category
@@ -208,24 +206,59 @@ class TransactionService:
         if not raw_merchant:
             return None
         raw_merchant_clean = raw_merchant.strip().upper()
-        if raw_merchant_clean in {"UNKNOWN", "UNCATEGORIZED", "NULL", "UNKNOWN MERCHANT"}:
+        if raw_merchant_clean in PLACEHOLDER_MERCHANTS:
             return None
             
         stmt = select(MerchantMapping).where(func.lower(MerchantMapping.raw_merchant) == raw_merchant.strip().lower())
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_merchant_mappings(self, raw_merchants: List[str]) -> dict:
+        """Bulk get_merchant_mapping: one query, keyed by the stripped lower-cased merchant name."""
+        keys = {
+            m.strip().lower() for m in raw_merchants
+            if m and m.strip().upper() not in PLACEHOLDER_MERCHANTS
+        }
+        if not keys:
+            return {}
+        stmt = select(MerchantMapping).where(func.lower(MerchantMapping.raw_merchant).in_(keys))
+        result = await self.db.execute(stmt)
+        mappings = {}
+        for mapping in result.scalars().all():
+            mappings.setdefault(mapping.raw_merchant.lower(), mapping)
+        return mappings
+
     async def get_transaction_by_hash(self, content_hash: str) -> Optional[Transaction]:
         stmt = select(Transaction).where(Transaction.raw_content_hash == content_hash)
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_existing_hashes(self, content_hashes: List[str]) -> set:
+        """Which of these content hashes are already stored, in one round-trip."""
+        if not content_hashes:
+            return set()
+        stmt = select(Transaction.raw_content_hash).where(Transaction.raw_content_hash.in_(content_hashes))
+        result = await self.db.execute(stmt)
+        return set(result.scalars().all())
+
     async def create_transaction(self, txn_data: dict) -> Transaction:
         txn = Transaction(**txn_data)
         self.db.add(txn)
         await self.db.commit()
         return txn
 
+    async def create_transactions(self, rows: List[dict], commit: bool = True) -> List[Transaction]:
+        """Batch create_transaction: one flush (multi-row INSERT) for all rows; commit=False leaves the commit to the caller."""
+        if not rows:
+            return []
+        txns = [Transaction(**row) for row in rows]
+        self.db.add_all(txns)
+        if commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
+        return txns
+
     async def create_manual_transaction(self, user_id: UUID, data: schemas.ManualTransactionCreate) -> Transaction:
         import hashlib
         import time
@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, ConfigDict
 from typing import Optional, List
 from datetime import date, datetime
 from uuid import UUID
@@ -51,8 +51,7 @@ class InvestmentHoldingOut(InvestmentHoldingBase):
     last_updated_at: Optional[datetime] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class InvestmentSnapshotBase(BaseModel):
     captured_at: date
@@ -66,8 +65,7 @@ class InvestmentSnapshotOut(InvestmentSnapshotBase):
     holding_id: UUID
     is_projected: bool = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class InvestmentMappingRuleCreate(BaseModel):
     holding_id: UUID
@@ -78,8 +76,7 @@ class InvestmentMappingRuleOut(InvestmentMappingRuleCreate):
     id: UUID
     user_id: UUID
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class WealthDashboardSummary(BaseModel):
     total_wealth: float
@@ -5,9 +5,6 @@ from typing import List, Optional, Tuple
 from datetime import date, datetime, timedelta
 import math
 import httpx
-import pandas as pd
-import numpy as np
-from scipy import optimize
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, func, and_
 from fastapi import HTTPException, Depends
@@ -379,7 +376,7 @@ class WealthService:
 
     # --- Transaction Mapping & Logic ---
 
-    async def process_transaction_match(self, transaction: Transaction) -> bool:
+    async def process_transaction_match(self, transaction: Transaction, commit: bool = True) -> bool:
         """
         Called by SyncService/TransactionService.
         Attempts to map a transaction to a holding and update it.
@@ -418,10 +415,10 @@ class WealthService:
             
         # Match found! Execute Logic.
         holding_id = matched_rule.holding_id
-        await self.add_transaction_to_holding(transaction, holding_id)
+        await self.add_transaction_to_holding(transaction, holding_id, commit=commit)
         return True
 
-    async def add_transaction_to_holding(self, transaction: Transaction, holding_id: uuid.UUID):
+    async def add_transaction_to_holding(self, transaction: Transaction, holding_id: uuid.UUID, commit: bool = True):
         """
         Calculates units and updates snapshot.
         Transaction Amount < 0 => BUY (usually).
@@ -514,7 +511,11 @@ class WealthService:
         # We can run a "recalculate_holding" task.
         await self.recalculate_holding_history(holding_id)
         
-        await self.db.commit()
+        # Callers batching several transactions (sync) commit once themselves
+        if commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
 
     async def recalculate_holding_history(self, holding_id: uuid.UUID):
         """
@@ -602,6 +603,7 @@ class WealthService:
 
             # Initial guess 0.1 (10%)
             # If newton fails, return 0
+            from scipy import optimize
             res = optimize.newton(xnpv, 0.1, fprime=xnpv_prime, maxiter=50)
             return res * 100 # Return percentage
         except Exception:
@@ -628,6 +630,7 @@ class WealthService:
         if len(rows) < 30: # Need some history
             return schemas.ForecastResponse(forecast=[], summary_text="Insufficient data for forecasting (need >30 data points).")
             
+        import pandas as pd
         df = pd.DataFrame(rows, columns=['ds', 'y'])
         
         # Prophet setup
@@ -1196,6 +1199,7 @@ class WealthService:
             def xnpv_prime(rate):
                 return sum([- (d - d0) / 365.0 * a / pow(1 + rate, (d - d0) / 365.0 + 1) for a, d in zip(amounts, dates_ord)])
             
+            from scipy import optimize
             res = optimize.newton(xnpv, 0.1, fprime=xnpv_prime, maxiter=50)
             return res * 100  # Return percentage
         except:
@@ -2,6 +2,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 # THE MOST EARLY LOG POSSIBLE
 print(">>> GRIP BACKEND STARTING UP...", flush=True)
@@ -40,12 +41,12 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     # Database Table Creation
     try:
-        if settings.ENVIRONMENT in ["local", "development", "production"]:
+        if settings.AUTO_CREATE_TABLES and settings.ENVIRONMENT in ["local", "development", "production"]:
             logger.info(f"Environment: {settings.ENVIRONMENT}. Ensuring tables...")
             async with engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
         else:
-            logger.info(f"Environment: {settings.ENVIRONMENT}. Skipping table creation.")
+            logger.info(f"Environment: {settings.ENVIRONMENT}. Skipping table creation (AUTO_CREATE_TABLES={settings.AUTO_CREATE_TABLES}).")
     except Exception as e:
         logger.error(f"Startup Database Error: {str(e)}")
         logger.exception("Full traceback:")  # This will log the full stack trace
@@ -59,12 +60,18 @@ async def lifespan(app: FastAPI):
         
     yield
 
+    # Release the pooled email relay connection
+    from app.core.email import close_relay_client
+    await close_relay_client()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 #app.router.redirect_slashes = False
+# add_middleware wraps outward, so requests pass CORS -> GZip -> Authentication -> routes
 app.add_middleware(AuthenticationMiddleware)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 app.add_middleware(
@@ -76,13 +83,12 @@ app.add_middleware(
 )
 
 from fastapi import Request
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global error: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal Server Error", "msg": str(exc)},
     )
@@ -90,28 +96,59 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logger.error(f"Validation error: {exc.errors()}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={"detail": exc.errors()},
     )
 
-app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
-app.include_router(transactions_router, prefix=f"{settings.API_V1_STR}/transactions", tags=["transactions"])
-app.include_router(sync_router, prefix=f"{settings.API_V1_STR}/sync", tags=["sync"])
-app.include_router(dashboard_router, prefix=f"{settings.API_V1_STR}/dashboard", tags=["dashboard"])
-app.include_router(credit_cards_router, prefix=f"{settings.API_V1_STR}/credit-cards", tags=["credit-cards"])
-app.include_router(bills_router, prefix=f"{settings.API_V1_STR}/bills", tags=["bills"])
-app.include_router(analytics_router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
-app.include_router(categories_router, prefix=f"{settings.API_V1_STR}/categories", tags=["categories"])
-app.include_router(goals_router, prefix=f"{settings.API_V1_STR}/goals", tags=["goals"])
-app.include_router(wealth_router, prefix=f"{settings.API_V1_STR}/wealth", tags=["wealth"])
-app.include_router(export_router, prefix=f"{settings.API_V1_STR}/export", tags=["export"])
-app.include_router(settle_up_router, prefix=f"{settings.API_V1_STR}/settle-up", tags=["settle-up"])
-app.include_router(internal_router, prefix=f"{settings.API_V1_STR}/internal", tags=["internal"])
-
-from fastapi.responses import HTMLResponse, FileResponse
+# (router, path segment under API_V1_STR); the segment doubles as the OpenAPI tag
+ROUTER_REGISTRY = [
+    (auth_router, "auth"),
+    (transactions_router, "transactions"),
+    (sync_router, "sync"),
+    (dashboard_router, "dashboard"),
+    (credit_cards_router, "credit-cards"),
+    (bills_router, "bills"),
+    (analytics_router, "analytics"),
+    (categories_router, "categories"),
+    (goals_router, "goals"),
+    (wealth_router, "wealth"),
+    (export_router, "export"),
+    (settle_up_router, "settle-up"),
+    (internal_router, "internal"),
+]
+
+api_prefix = settings.API_V1_STR
+for feature_router, name in ROUTER_REGISTRY:
+    app.include_router(feature_router, prefix=f"{api_prefix}/{name}", tags=[name])
+
+from fastapi.responses import HTMLResponse, Response
+import hashlib
 import os
 
+_STATIC_DIR = os.path.join(os.path.dirname(__file__), "..", "static")
+
+def _load_static_page(filename: str):
+    """Read a legal page once at import. Returns (content, etag), or None if the file is missing."""
+    path = os.path.join(_STATIC_DIR, filename)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        content = f.read()
+    return content, f'"{hashlib.md5(content).hexdigest()}"'
+
+_PRIVACY_PAGE = _load_static_page("privacy.html")
+_TERMS_PAGE = _load_static_page("terms.html")
+
+def _static_page_response(request: Request, page, fallback_html: str) -> Response:
+    if page is None:
+        return HTMLResponse(fallback_html)
+    content, etag = page
+    headers = {"Cache-Control": "public, max-age=86400", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content, headers=headers)
+
 @app.get("/", tags=["status"])
 async def root():
     return {
@@ -124,15 +161,15 @@ async def root():
     }
 
 @app.get("/privacy", response_class=HTMLResponse, tags=["legal"])
-async def privacy_policy():
-    static_path = os.path.join(os.path.dirname(__file__), "..", "static", "privacy.html")
-    if os.path.exists(static_path):
-        return FileResponse(static_path)
-    return HTMLResponse("<h1>Privacy Policy</h1><p>Grip Intelligence Privacy Policy is being updated.</p>")
+async def privacy_policy(request: Request):
+    return _static_page_response(
+        request, _PRIVACY_PAGE,
+        "<h1>Privacy Policy</h1><p>Grip Intelligence Privacy Policy is being updated.</p>"
+    )
 
 @app.get("/terms", response_class=HTMLResponse, tags=["legal"])
-async def terms_of_service():
-    static_path = os.path.join(os.path.dirname(__file__), "..", "static", "terms.html")
-    if os.path.exists(static_path):
-        return FileResponse(static_path)
-    return HTMLResponse("<h1>Terms of Service</h1><p>Grip Intelligence Terms of Service are being updated.</p>")
+async def terms_of_service(request: Request):
+    return _static_page_response(
+        request, _TERMS_PAGE,
+        "<h1>Terms of Service</h1><p>Grip Intelligence Terms of Service are being updated.</p>"
+    )
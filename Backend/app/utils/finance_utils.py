@@ -140,8 +140,10 @@ def calculate_variance_percentage(current: Decimal, previous: Decimal) -> float:
     if previous == 0:
         return 100.0 if current > 0 else 0.0
     
-    variance = ((current - previous) / previous) * 100
-    return float(variance)
+    # The result is a float anyway; dividing in float skips a 28-digit Decimal division
+    current_f = float(current)
+    previous_f = float(previous)
+    return (current_f - previous_f) / previous_f * 100
 
 
 def get_trend_indicator(variance_percentage: float, threshold: float = 5.0) -> str:
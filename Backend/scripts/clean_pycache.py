@@ -1,35 +1,41 @@
 import os
 import shutil
 
-def clean_pycache(directory="."):
-    """
-    Recursively remove all __pycache__ directories and .pyc files
-    """
+def _clean_dir(directory):
+    """Scan one directory level; DirEntry type checks come from the directory listing, not a stat per file."""
     cleaned_count = 0
-    print(f"Starting cleanup in: {os.path.abspath(directory)}")
-    
-    for root, dirs, files in os.walk(directory):
-        # Remove __pycache__ directories
-        if "__pycache__" in dirs:
-            pycache_path = os.path.join(root, "__pycache__")
-            try:
-                shutil.rmtree(pycache_path)
-                print(f"  Removed directory: {pycache_path}")
-                cleaned_count += 1
-            except Exception as e:
-                print(f"  Error removing {pycache_path}: {e}")
-        
-        # Remove orphaned .pyc and .pyo files
-        for file in files:
-            if file.endswith((".pyc", ".pyo")):
-                file_path = os.path.join(root, file)
+    try:
+        entries = list(os.scandir(directory))
+    except OSError as e:
+        print(f"  Error scanning {directory}: {e}")
+        return 0
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name == "__pycache__":
+                # Remove __pycache__ directories (and never descend into them)
                 try:
-                    os.remove(file_path)
-                    print(f"  Removed file: {file_path}")
+                    shutil.rmtree(entry.path)
                     cleaned_count += 1
                 except Exception as e:
-                    print(f"  Error removing {file_path}: {e}")
+                    print(f"  Error removing {entry.path}: {e}")
+            else:
+                cleaned_count += _clean_dir(entry.path)
+        elif entry.name.endswith((".pyc", ".pyo")):
+            # Remove orphaned .pyc and .pyo files
+            try:
+                os.unlink(entry.path)
+                cleaned_count += 1
+            except Exception as e:
+                print(f"  Error removing {entry.path}: {e}")
+    return cleaned_count
 
+def clean_pycache(directory="."):
+    """
+    Recursively remove all __pycache__ directories and .pyc files
+    """
+    print(f"Starting cleanup in: {os.path.abspath(directory)}")
+    cleaned_count = _clean_dir(directory)
     print(f"\nCleanup finished. {cleaned_count} items removed.")
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 from fastapi import FastAPI, HTTPException, Header, Depends
 from pydantic import BaseModel, EmailStr
+import asyncio
+import queue
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+from email.message import EmailMessage
 import os
 from typing import Optional
 
@@ -11,6 +13,83 @@ app = FastAPI(title="Grip Email Relay")
 # This secret should be shared between your main backend and this microservice
 EMAIL_RELAY_SECRET = os.getenv("EMAIL_RELAY_SECRET", "change-me-in-production")
 
+class SMTPPool:
+    """
+    Warm, logged-in SMTP connections reused across requests, so only the first send
+    (or one after the server drops us) pays for connect + TLS + AUTH.
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str, max_idle: int = 4):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+
+    def _connect(self) -> smtplib.SMTP:
+        # Since Vercel is often liberal with ports, we try standard 587
+        # or 465 based on what you configure in environment.
+        if self.port == 465:
+            server = smtplib.SMTP_SSL(self.host, self.port)
+        else:
+            server = smtplib.SMTP(self.host, self.port)
+            server.starttls()
+        server.login(self.user, self.password)
+        return server
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            try:
+                # Idle connections may have been closed by the server; NOOP detects that cheaply
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(server)
+
+    def _checkin(self, server: smtplib.SMTP):
+        try:
+            self._idle.put_nowait(server)
+        except queue.Full:
+            self._close(server)
+
+    def _close(self, server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def send(self, message: EmailMessage):
+        """Blocking send; call from a worker thread. Envelope addresses come from From/To."""
+        server = self._checkout()
+        try:
+            try:
+                server.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # Dropped between the NOOP and the send: retry once on a fresh connection
+                self._close(server)
+                server = self._connect()
+                server.send_message(message)
+        except Exception:
+            self._close(server)
+            raise
+        self._checkin(server)
+
+_smtp_pools = {}
+_smtp_pools_lock = threading.Lock()
+
+def get_smtp_pool(host: str, port: int, user: str, password: str) -> SMTPPool:
+    key = (host, port, user, password)
+    with _smtp_pools_lock:
+        pool = _smtp_pools.get(key)
+        if pool is None:
+            pool = _smtp_pools[key] = SMTPPool(host, port, user, password)
+        return pool
+
 class EmailRequest(BaseModel):
     to_email: EmailStr
     subject: str
@@ -40,23 +119,17 @@ async def send_email(
         raise HTTPException(status_code=500, detail="Relay SMTP credentials missing")
 
     try:
-        message = MIMEMultipart("alternative")
+        # Single-part HTML (as before); EmailMessage picks the transfer encoding per body
+        # instead of forcing base64 the way MIMEText's utf-8 charset does
+        message = EmailMessage()
         message["Subject"] = request.subject
         message["From"] = f"{request.from_name} <{from_email}>"
         message["To"] = request.to_email
-        message.attach(MIMEText(request.html_content, "html"))
+        message.set_content(request.html_content, subtype="html")
 
-        # Since Vercel is often liberal with ports, we try standard 587
-        # or 465 based on what you configure in environment.
-        if port == 465:
-            with smtplib.SMTP_SSL(host, port) as server:
-                server.login(user, password)
-                server.sendmail(from_email, request.to_email, message.as_string())
-        else:
-            with smtplib.SMTP(host, port) as server:
-                server.starttls()
-                server.login(user, password)
-                server.sendmail(from_email, request.to_email, message.as_string())
+        # smtplib is blocking; keep it off the event loop
+        pool = get_smtp_pool(host, port, user, password)
+        await asyncio.to_thread(pool.send, message)
         
         return {"status": "sent"}
     except Exception as e: